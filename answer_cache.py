@@ -0,0 +1,150 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from data_cache import CacheEntry
+from metrics import metrics
+
+load_dotenv()
+
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1000"))
+# Reuse the executed result on a hit, not just the generated code
+ANSWER_CACHE_REUSE_RESULT = os.getenv("ANSWER_CACHE_REUSE_RESULT", "1") != "0"
+# Opt-in near-duplicate matching of standalone questions
+ANSWER_CACHE_SEMANTIC = os.getenv("ANSWER_CACHE_SEMANTIC", "0") == "1"
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.92"))
+
+# Dimensions of the hashed character n-gram vectors used for near-duplicate matching
+_EMBEDDING_DIM = 1024
+# Numbers and quoted values: "top 5" vs "top 10", 2023 vs 2024, 'GLS' vs 'TNT'
+_LITERAL = re.compile(r"""\d+(?:[.,]\d+)*|"[^"]*"|“[^”]*”|(?<!\w)'[^']*'(?!\w)""")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return " ".join(question.split()).casefold().rstrip(" ?!.")
+
+
+def embed_locally(text: str) -> np.ndarray:
+    """
+    Cheap local embedding: L2-normalized hashed character trigrams.
+
+    Catches rephrasings that differ in word order, plurals or small typos
+    without a network call or model download; it is lexical, not semantic
+    in the deep sense, which keeps false matches rare at a high threshold.
+    """
+    vector = np.zeros(_EMBEDDING_DIM, dtype=np.float32)
+    padded = f"  {text} "
+    for i in range(len(padded) - 2):
+        digest = hashlib.blake2b(padded[i:i + 3].encode("utf-8"), digest_size=4).digest()
+        vector[int.from_bytes(digest, "little") % _EMBEDDING_DIM] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def literal_tokens(question: str) -> Tuple[str, ...]:
+    """Numbers and quoted values in a question, which a near-duplicate must repeat exactly."""
+    return tuple(_LITERAL.findall(question))
+
+
+def file_content_hash(entry: CacheEntry) -> str:
+    """SHA-256 of the file behind a DataFrame cache entry, computed once per file version."""
+    digest = entry.extras.get("content_hash")
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(entry.key[0], "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(block)
+        digest = entry.extras["content_hash"] = sha.hexdigest()
+    return digest
+
+
+@dataclass
+class CachedAnswer:
+    query: str
+    response: str
+
+
+class AnswerCache:
+    """
+    Maps (file content hash, normalized standalone question) to the generated
+    pandas code and its executed result, so repeated questions against the
+    same data skip query generation (and execution).
+    """
+
+    def __init__(self, max_entries: int, semantic: bool = False, similarity: float = 0.92):
+        self.max_entries = max_entries
+        self.semantic = semantic
+        self.similarity = similarity
+        self._entries: "OrderedDict[Tuple[str, str], CachedAnswer]" = OrderedDict()
+        self._vectors: Dict[Tuple[str, str], Tuple[Tuple[str, ...], np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def get(self, content_hash: str, question: str) -> Optional[CachedAnswer]:
+        key = (content_hash, normalize_question(question))
+        with self._lock:
+            answer = self._entries.get(key)
+            if answer is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.inc("answer_cache_lookups", result="hit")
+                return answer
+
+            if self.semantic:
+                match = self._nearest(content_hash, literal_tokens(key[1]), embed_locally(key[1]))
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    self.near_hits += 1
+                    metrics.inc("answer_cache_lookups", result="near_hit")
+                    return self._entries[match]
+
+            self.misses += 1
+            metrics.inc("answer_cache_lookups", result="miss")
+            return None
+
+    def put(self, content_hash: str, question: str, query: str, response: str) -> None:
+        key = (content_hash, normalize_question(question))
+        with self._lock:
+            self._entries[key] = CachedAnswer(query=query, response=response)
+            self._entries.move_to_end(key)
+            if self.semantic:
+                self._vectors[key] = (literal_tokens(key[1]), embed_locally(key[1]))
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._vectors.pop(evicted, None)
+
+    def _nearest(self, content_hash: str, literals: Tuple[str, ...], vector: np.ndarray):
+        best_key, best_score = None, self.similarity
+        for key, (other_literals, other) in self._vectors.items():
+            # Trigram similarity barely sees "top 5" vs "top 10"; the literals must match exactly
+            if key[0] != content_hash or other_literals != literals:
+                continue
+            score = float(vector @ other)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.misses
+            return {
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+# Shared cache instance
+answer_cache = AnswerCache(ANSWER_CACHE_SIZE, ANSWER_CACHE_SEMANTIC, ANSWER_CACHE_SIMILARITY)
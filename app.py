@@ -1,12 +1,15 @@
-import pandas as pd
 import streamlit as st
 import dotenv
 import os
-import json
-from llm import get_completion
-from csv_agent import run_csv_chat_agent
-import pandas as pd
-import numpy as np
+import uuid
+import importlib
+import threading
+from termcolor import colored
+from async_engine import async_engine
+from file_catalog import file_catalog
+from feedback_store import feedback_store
+# The PDF (llm) and CSV (csv_agent) stacks are imported where each mode
+# first needs them, so the page renders before either has loaded
 
 
 # Load environment variables from a .env file
@@ -20,8 +23,6 @@ st.set_page_config(
     layout="centered"
 )
 
-thread_id_1 = "conversation_1"
-
 def load_custom_css(file_path):
     with open(file_path) as f:
         st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
@@ -29,35 +30,15 @@ def load_custom_css(file_path):
 # Apply custom CSS
 load_custom_css('custom.css')
 
-# Function to save feedback to JSON files
+# Function to save feedback; appended to the feedback store and written in the background
 def save_feedback(user_input, assistant_response, feedback_type):
-    # Create directory if it doesn't exist
-    os.makedirs("feedback", exist_ok=True)
-    
-    # Path to the feedback file
-    json_file = f"feedback/{feedback_type}.json"
-    
-    # Prepare the feedback data
-    feedback_data = {
-        "user_input": user_input,
-        "assistant_response": assistant_response,
-        "timestamp": st.session_state.get("current_time", "")
-    }
-    
-    # Load existing feedback data if the file exists
-    existing_data = []
-    if os.path.exists(json_file):
-        try:
-            with open(json_file, 'r') as f:
-                existing_data = json.load(f)
-        except json.JSONDecodeError:
-            # If the file is empty or invalid JSON
-            existing_data = []
-    
-    # Append new feedback and save
-    existing_data.append(feedback_data)
-    with open(json_file, 'w') as f:
-        json.dump(existing_data, f, indent=2)
+    feedback_store.record(
+        user_input,
+        assistant_response,
+        feedback_type,
+        thread_id=st.session_state.get("thread_id"),
+        mode=st.session_state.get("chat_mode"),
+    )
 
 # Hide Streamlit default elements
 hide_streamlit_style = """
@@ -97,12 +78,17 @@ if "previous_csv" not in st.session_state:
 if "feedback_given" not in st.session_state:
     st.session_state.feedback_given = {}
 
+# Each browser session (and each cleared chat) gets its own agent memory
+if "thread_id" not in st.session_state:
+    st.session_state.thread_id = str(uuid.uuid4())
+
 # Current time for timestamp
 from datetime import datetime
 st.session_state.current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-# Hard-coded PDF documents (since they're already embedded in the model)
-pdf_documents = [
+# Documents embedded before the ingest manifest existed; everything ingested
+# since is listed from the manifest through the file catalog
+PRE_MANIFEST_PDF_DOCUMENTS = [
     "GLS Bergamo National Italy Contract.pdf",
     "Poste Delivery Business Pricing.jpeg",
     "Poste Delivery Business Contract.pdf",
@@ -119,15 +105,15 @@ pdf_documents = [
 
 ]
 
+def get_pdf_documents():
+    ingested = [doc.name for doc in file_catalog.pdf_documents()]
+    return ingested + [doc for doc in PRE_MANIFEST_PDF_DOCUMENTS if doc not in ingested]
+
+
 # Function to get available CSV documents
 def get_csv_documents():
-    # Change this path to where your CSV documents are stored
-    csv_path = "all_csv_documents/"
-    data_files = []
-    for file in os.listdir(csv_path):
-        if file.endswith('.csv') or file.endswith('.xlsx'):
-            data_files.append((file, os.path.join(csv_path, file)))
-    return data_files
+    # Served from the catalog; the folder is rescanned in the background, not on every rerun
+    return [(info.name, info.path) for info in file_catalog.data_files()]
 
 # Side panel for mode selection and document selection
 with st.sidebar:
@@ -199,7 +185,7 @@ with st.sidebar:
     if chat_mode == "PDF":
         st.subheader("Available PDF Documents")
         st.markdown('<div class="pdf-list">', unsafe_allow_html=True)
-        for doc in pdf_documents:
+        for doc in get_pdf_documents():
             st.markdown(f'<div class="pdf-list-item"><svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M14 2H6a2 2 0 0 0-2 2v16a2 2 0 0 0 2 2h12a2 2 0 0 0 2-2V8z"></path><polyline points="14 2 14 8 20 8"></polyline><line x1="16" y1="13" x2="8" y2="13"></line><line x1="16" y1="17" x2="8" y2="17"></line><polyline points="10 9 9 9 8 9"></polyline></svg> {doc}</div>', unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
     else:  # CSV mode
@@ -216,6 +202,11 @@ with st.sidebar:
             )
             selected_index = csv_names.index(selected_csv_name)
             st.session_state.selected_csv = csv_paths[selected_index]
+
+            # Auto: DuckDB queries files above DUCKDB_THRESHOLD_MB in place, pandas loads the rest
+            engines = {"Auto": None, "pandas (in memory)": "pandas", "DuckDB (out of core)": "duckdb"}
+            engine_name = st.selectbox("Query engine", options=list(engines), index=0, key="csv_engine_selector")
+            st.session_state.csv_engine = engines[engine_name]
         else:
             st.warning("No data files found.")
             st.session_state.selected_csv = None
@@ -226,6 +217,7 @@ with st.sidebar:
     if st.button("Clear Chat", key="clear_chat"):
         st.session_state.messages = []
         st.session_state.feedback_given = {}
+        st.session_state.thread_id = str(uuid.uuid4())
         st.rerun()
 
 # Check if mode or CSV selection has changed
@@ -235,6 +227,7 @@ if (st.session_state.previous_mode != st.session_state.chat_mode or
     # Reset chat
     st.session_state.messages = []
     st.session_state.feedback_given = {}
+    st.session_state.thread_id = str(uuid.uuid4())
     st.session_state.previous_mode = st.session_state.chat_mode
     st.session_state.previous_csv = st.session_state.selected_csv
 
@@ -287,7 +280,22 @@ else:
     if st.session_state.selected_csv:
         csv_name = os.path.basename(st.session_state.selected_csv)
         def column_names(csv_file):
-            df = pd.read_csv(csv_file)
+            from data_cache import load_dataframe
+            from duckdb_engine import DuckDBAccessError, choose_engine, profile_file
+
+            info = file_catalog.get(csv_file)
+            if info is not None and info.status == "ready" and st.session_state.get("csv_engine") in (None, info.engine):
+                return [name for name, _ in info.columns], (info.rows, len(info.columns))
+            if choose_engine(csv_file, st.session_state.get("csv_engine")) == "duckdb":
+                import duckdb
+
+                try:
+                    profile = profile_file(csv_file)
+                    return [column.name for column in profile.columns], (profile.rows, len(profile.columns))
+                except (DuckDBAccessError, duckdb.Error, OSError) as e:
+                    # Same fallback as build_csv_context: the question will run on pandas
+                    print(colored(f"DuckDB could not open {csv_file} ({e}); loading it with pandas instead", "yellow"))
+            df = load_dataframe(csv_file)
             return df.columns.tolist(), df.shape
 
         column_names, shape = column_names(st.session_state.selected_csv)
@@ -299,6 +307,19 @@ else:
     else:
         st.warning("⚠️ Please select a CSV file from the sidebar")
 
+# Function to render streamed agent events
+def render_stream(events, status):
+    """Shows intermediate steps in the status box and yields answer tokens for st.write_stream."""
+    for event in events:
+        if event["type"] == "token":
+            yield event["content"]
+        elif event["type"] == "code":
+            status.code(event["content"], language="python")
+        else:
+            status.update(label=event["label"], state="running")
+            if event.get("content"):
+                status.write(event["content"])
+
 # Function to generate a unique ID for each message pair
 def get_message_id(idx):
     return f"msg_{idx}"
@@ -356,33 +377,30 @@ if user_input:
     with st.chat_message("user"):
         st.markdown(user_input)
     
-    # Use st.status instead of st.spinner
-    with st.status("Processing your request...", expanded=True) as status:
+    # Use st.status instead of st.spinner; intermediate steps show up here while the answer streams below
+    status = st.status("Thinking...", expanded=True)
+    with st.chat_message("assistant"):
         # Process based on mode
         if st.session_state.chat_mode == "PDF":
-            status.update(label="Thinking...", state="running")
-            response = get_completion(user_input, thread_id_1)
-            status.update(label="✅ Analysis complete", state="complete")
-        else:  # CSV mode
-            if st.session_state.selected_csv:
-                # status.update(label=f"Analyzing CSV data from {os.path.basename(st.session_state.selected_csv)}...", state="running")
-                status.update(label=f"Thinking...", state="running")
-
-                thread_id = "conversation_1"
-
-                response = run_csv_chat_agent(st.session_state.selected_csv, user_input, thread_id)
-                status.update(label="✅ Analysis complete", state="complete")
-            else:
-                response = "Please select a CSV file from the sidebar first."
-                status.update(label="⚠️ No CSV file selected", state="error")
-    
+            from llm import astream_completion
+            events = async_engine.iterate(astream_completion(user_input, st.session_state.thread_id))
+        elif st.session_state.selected_csv:
+            from csv_agent import astream_csv_chat_agent
+            events = async_engine.iterate(astream_csv_chat_agent(st.session_state.selected_csv, user_input, st.session_state.thread_id, st.session_state.get("csv_engine")))
+        else:
+            events = None
+
+        if events is None:
+            response = "Please select a CSV file from the sidebar first."
+            status.update(label="⚠️ No CSV file selected", state="error")
+            st.markdown(response)
+        else:
+            response = st.write_stream(render_stream(events, status)) or "No response generated."
+            status.update(label="✅ Analysis complete", state="complete", expanded=False)
 
     # Add assistant response to chat
     st.session_state.messages.append({"role": "assistant", "content": response})
     
-    with st.chat_message("assistant"):
-        st.markdown(response)
-    
     st.rerun()
 
 st.markdown('</div>', unsafe_allow_html=True)
@@ -393,3 +411,26 @@ st.markdown("""
     <p>Made with ❤️ by Nilesh | Data updated: March 12, 2025</p>
 </div>
 """, unsafe_allow_html=True)
+
+
+@st.cache_resource(show_spinner=False)
+def preload_stack(module_name):
+    """Import a chat mode's stack in the background, once per process, after the page has rendered."""
+    thread = threading.Thread(target=importlib.import_module, args=(module_name,), name=f"preload-{module_name}", daemon=True)
+    thread.start()
+    return thread
+
+
+preload_stack("llm" if st.session_state.chat_mode == "PDF" else "csv_agent")
+
+
+@st.cache_resource(show_spinner=False)
+def start_file_catalog():
+    """Start watching CSV_DOCUMENTS_DIR once per process; watching only stats the files."""
+    return file_catalog.start()
+
+
+start_file_catalog()
+if st.session_state.chat_mode == "CSV":
+    # Pre-warming loads data files with the CSV stack, so PDF-only sessions never trigger it
+    file_catalog.start_warming()
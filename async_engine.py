@@ -0,0 +1,169 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Dict, Iterator, Optional, Tuple, TypeVar
+
+from dotenv import load_dotenv
+
+from metrics import metrics
+
+load_dotenv()
+
+T = TypeVar("T")
+
+# Requests allowed to be in flight against all providers together
+ENGINE_MAX_CONCURRENCY = int(os.getenv("ENGINE_MAX_CONCURRENCY", "16"))
+
+
+@dataclass
+class ProviderLimit:
+    max_concurrency: int
+    requests_per_second: float
+
+
+PROVIDER_LIMITS = {
+    "gemini": ProviderLimit(
+        max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")),
+        requests_per_second=float(os.getenv("GEMINI_REQUESTS_PER_SECOND", "10")),
+    ),
+}
+
+
+class _RateLimiter:
+    """Spaces out request starts so a provider sees at most ``rate`` requests per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        start = max(now, self._next)
+        self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class FairScheduler:
+    """
+    Bounded, fair admission of LLM calls.
+
+    Callers wait in one FIFO queue per session. Whenever a slot frees up the
+    sessions are served round-robin, so one session firing many calls cannot
+    starve the others. A call is admitted only while both the global limit and
+    its provider's concurrency limit have room, and then waits for the
+    provider's rate limiter before it starts.
+
+    Must only be used from the event loop of the engine that owns it.
+    """
+
+    def __init__(self, max_concurrency: int, limits: Dict[str, ProviderLimit]):
+        self.max_concurrency = max_concurrency
+        self.limits = limits
+        self._queues: "OrderedDict[str, deque[Tuple[str, asyncio.Future]]]" = OrderedDict()
+        self._active = 0
+        self._active_by_provider: Dict[str, int] = {}
+        self._rate_limiters = {name: _RateLimiter(limit.requests_per_second) for name, limit in limits.items()}
+
+    def _has_room(self, provider: str) -> bool:
+        if self._active >= self.max_concurrency:
+            return False
+        limit = self.limits.get(provider)
+        return limit is None or self._active_by_provider.get(provider, 0) < limit.max_concurrency
+
+    def _dispatch(self) -> None:
+        # One pass over the sessions in round-robin order, admitting at most one call each
+        for session in list(self._queues):
+            if self._active >= self.max_concurrency:
+                return
+            queue = self._queues[session]
+            while queue and queue[0][1].cancelled():
+                queue.popleft()
+            if queue and self._has_room(queue[0][0]):
+                provider, waiter = queue.popleft()
+                self._active += 1
+                self._active_by_provider[provider] = self._active_by_provider.get(provider, 0) + 1
+                waiter.set_result(None)
+                # Served sessions go to the back of the rotation
+                self._queues.move_to_end(session)
+            if not queue:
+                del self._queues[session]
+
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    @asynccontextmanager
+    async def slot(self, session: str, provider: str):
+        """Wait for this session's turn and a free slot for ``provider``."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(session, deque()).append((provider, waiter))
+        enqueued = time.perf_counter()
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Admitted just as we were cancelled: give the slot back
+                self._release(provider)
+            raise
+        metrics.observe("scheduler_wait_seconds", time.perf_counter() - enqueued, provider=provider)
+        try:
+            limiter = self._rate_limiters.get(provider)
+            if limiter is not None:
+                await limiter.wait()
+            yield
+        finally:
+            self._release(provider)
+
+    def _release(self, provider: str) -> None:
+        self._active -= 1
+        self._active_by_provider[provider] -= 1
+        self._dispatch()
+
+
+class AsyncEngine:
+    """
+    Event loop running on a background thread, shared by every Streamlit session.
+
+    Sync code (Streamlit script threads) hands coroutines and async generators
+    to the engine and blocks only on its own result, while all LLM calls from
+    all sessions are multiplexed on one loop and admitted by one scheduler.
+    """
+
+    def __init__(self, max_concurrency: int, limits: Dict[str, ProviderLimit]):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="async-engine", daemon=True)
+        self._thread.start()
+        self.scheduler = FairScheduler(max_concurrency, limits)
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the engine loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def iterate(self, agen: AsyncIterator[T]) -> Iterator[T]:
+        """Consume an async generator on the engine loop as a regular generator."""
+        try:
+            while True:
+                try:
+                    yield self.run(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.run(agen.aclose())
+
+
+# Shared engine instance
+async_engine = AsyncEngine(ENGINE_MAX_CONCURRENCY, PROVIDER_LIMITS)
+
+
+@asynccontextmanager
+async def llm_slot(session: str, provider: str = "gemini"):
+    """Admission for one LLM call through the shared scheduler."""
+    async with async_engine.scheduler.slot(session, provider):
+        yield
@@ -0,0 +1,77 @@
+"""
+Per-call overhead of the CSV agent with the graph compiled per request vs. once.
+
+The LLM is replaced by an in-process stub, so the numbers are pure
+orchestration overhead (graph build/compile, state handling, checkpointing).
+
+Usage:
+    python benchmarks/bench_csv_graph.py --calls 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ["LANGSMITH_TRACING"] = "false"
+
+import numpy as np
+import pandas as pd
+
+import csv_agent
+
+
+class StubMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class StubLLM:
+    """Answers every prompt instantly; code generation returns a fixed pandas expression."""
+
+    def invoke(self, prompt):
+        text = str(prompt)
+        if "Generate a Python code snippet" in text:
+            return StubMessage("df['price'].sum()")
+        return StubMessage("What is the total price?")
+
+
+def run_once(app, file_path: str) -> None:
+    ctx = csv_agent.build_csv_context(file_path)
+    config = {"configurable": {"thread_id": str(uuid.uuid4()), "csv_context": ctx}}
+    app.invoke({"question": "What is the total price?", "attempts": 0}, config=config)
+
+
+def bench(label: str, calls: int, fn) -> None:
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<28} median {statistics.median(timings):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    csv_agent.client_registry.register(csv_agent.GEMINI_CSV, StubLLM)
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "orders.csv")
+        pd.DataFrame({"price": np.arange(1000) * 1.5, "quantity": np.arange(1000) % 7}).to_csv(file_path, index=False)
+        # Warm the DataFrame cache so only graph overhead differs between runs
+        run_once(csv_agent.csv_app, file_path)
+
+        bench("compile per call (before)", args.calls, lambda: run_once(csv_agent.build_csv_graph(), file_path))
+        bench("compiled once (after)", args.calls, lambda: run_once(csv_agent.csv_app, file_path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Time and peak RSS of typical CSV questions on the pandas and DuckDB engines.
+
+A synthetic order export is written as CSV in chunks, so generating it never
+needs the whole file in memory. Each engine answers three questions in a
+fresh subprocess:
+total revenue, top-10 products by quantity, and monthly revenue.
+The pandas engine first loads the whole file, as on a user's first question.
+DuckDB scans the file in place.
+A pandas run that dies (usually out of memory on the larger files) is
+reported as failed.
+
+Usage:
+    python benchmarks/bench_duckdb.py --rows 1000000 50000000
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_sidecar import make_frame
+
+CHUNK_ROWS = 1_000_000
+
+PANDAS_QUESTIONS = {
+    "total": "(df['price'] * df['quantity']).sum()",
+    "top-10": "df.groupby('product')['quantity'].sum().nlargest(10)",
+    "trend": "(df['price'] * df['quantity']).groupby(pd.to_datetime(df['order_date']).dt.to_period('M')).sum()",
+}
+SQL_QUESTIONS = {
+    "total": "SELECT SUM(price * quantity) FROM df",
+    "top-10": "SELECT product, SUM(quantity) AS quantity FROM df GROUP BY product ORDER BY quantity DESC LIMIT 10",
+    "trend": "SELECT date_trunc('month', order_date) AS month, SUM(price * quantity) AS revenue FROM df GROUP BY month ORDER BY month",
+}
+
+
+def write_csv(path: str, rows: int) -> None:
+    for offset in range(0, rows, CHUNK_ROWS):
+        chunk = make_frame(min(CHUNK_ROWS, rows - offset))
+        chunk["order_id"] += offset
+        chunk.to_csv(path, mode="a", header=offset == 0, index=False)
+
+
+def _child(engine: str, path: str) -> None:
+    timings = {}
+    if engine == "pandas":
+        import pandas as pd
+        from sidecar import read_source_file
+
+        start = time.perf_counter()
+        df = read_source_file(path)
+        timings["load"] = time.perf_counter() - start
+        for name, code in PANDAS_QUESTIONS.items():
+            start = time.perf_counter()
+            eval(code, {"df": df, "pd": pd})
+            timings[name] = time.perf_counter() - start
+    else:
+        from duckdb_engine import profile_file, run_sql
+
+        start = time.perf_counter()
+        profile_file(path)
+        timings["load"] = time.perf_counter() - start
+        for name, sql in SQL_QUESTIONS.items():
+            start = time.perf_counter()
+            result = run_sql(path, sql, timeout=3600)
+            timings[name] = time.perf_counter() - start
+            if not result.ok:
+                raise RuntimeError(result.text)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(" ".join(f"{name}={seconds:.3f}" for name, seconds in timings.items()), f"peak={peak_kb}")
+
+
+def measure(engine: str, path: str):
+    """Timings of one child run, or the CompletedProcess of a child that failed."""
+    proc = subprocess.run([sys.executable, __file__, "--child", engine, path], capture_output=True, text=True)
+    if proc.returncode != 0:
+        return proc
+    fields = dict(item.split("=") for item in proc.stdout.split())
+    return {name: float(value) for name, value in fields.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 50_000_000])
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(*args.child)
+        return
+
+    print(f"{'rows':>12}  {'engine':<7} {'load/profile':>12} {'total':>8} {'top-10':>8} {'trend':>8} {'peak RSS':>10}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "orders.csv")
+            write_csv(path, rows)
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            for engine in ("pandas", "duckdb"):
+                result = measure(engine, path)
+                if isinstance(result, subprocess.CompletedProcess):
+                    # A negative status is the signal that killed the child, e.g. -9 from the OOM killer
+                    error = (result.stderr.strip().splitlines() or ["no output"])[-1]
+                    print(f"{rows:>12,}  {engine:<7} failed on a {size_mb:,.0f} MB file (exit status {result.returncode}): {error}")
+                    continue
+                print(
+                    f"{rows:>12,}  {engine:<7} {result['load']:>11.2f}s "
+                    f"{result['total']:>7.2f}s {result['top-10']:>7.2f}s {result['trend']:>7.2f}s "
+                    f"{result['peak'] / 1024:>8.0f} MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+LLM calls and latency per CSV question with and without the interpret_question fast path.
+
+A scripted conversation mixing first questions, standalone follow-ups and
+elliptical follow-ups is replayed against a fake LLM with fixed latency,
+in three configurations:
+
+    baseline   every question is rephrased by its own LLM call
+    fast path  standalone questions skip the rephrasing call
+    combined   fast path, and remaining follow-ups rephrase + generate in one call
+
+The answer cache is disabled so every question reaches the LLM.
+
+Usage:
+    python benchmarks/bench_fast_path.py --conversations 20 --llm-latency 0.3
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ["LANGSMITH_TRACING"] = "false"
+os.environ["CSV_SANDBOX"] = "0"
+
+import numpy as np
+import pandas as pd
+
+import csv_agent
+from answer_cache import AnswerCache
+
+CONVERSATION = [
+    "What is the total price of all orders?",
+    "Which product has the highest quantity sold?",
+    "and what about the lowest one?",
+    "How many orders have a price above 100?",
+    "same for quantity",
+]
+
+
+class FakeMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class CountingLLM:
+    """Sleeps for a fixed latency per call and counts the calls."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        time.sleep(self.latency)
+        text = str(prompt)
+        if "Standalone question: <the rephrased question>" in text:
+            return FakeMessage("Standalone question: What is the total price?\nCode:\ndf['price'].sum()")
+        if "Generate a Python code snippet" in text:
+            return FakeMessage("df['price'].sum()")
+        if "Formatted Answer:" in text:
+            return FakeMessage("The total price is 749250.")
+        return FakeMessage("What is the total price?")
+
+
+def run(label: str, fast_path: bool, combined: bool, file_path: str, conversations: int, latency: float) -> None:
+    csv_agent.CSV_FAST_PATH = fast_path
+    csv_agent.CSV_COMBINED_INTERPRET = combined
+    llm = CountingLLM(latency)
+    csv_agent.client_registry.register(csv_agent.GEMINI_CSV, lambda: llm)
+    ctx = csv_agent.build_csv_context(file_path)
+
+    timings = []
+    for _ in range(conversations):
+        config = {"configurable": {"thread_id": str(uuid.uuid4()), "csv_context": ctx}}
+        for question in CONVERSATION:
+            start = time.perf_counter()
+            csv_agent.csv_app.invoke({"question": question, "attempts": 0}, config=config)
+            timings.append(time.perf_counter() - start)
+
+    print(
+        f"{label:<10} LLM calls/question {llm.calls / len(timings):.2f}   "
+        f"median {statistics.median(timings) * 1000:7.1f} ms   mean {statistics.mean(timings) * 1000:7.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="seconds per fake LLM call")
+    args = parser.parse_args()
+
+    csv_agent.answer_cache = AnswerCache(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "orders.csv")
+        pd.DataFrame({"price": np.arange(1000) * 1.5, "quantity": np.arange(1000) % 7}).to_csv(file_path, index=False)
+
+        run("baseline", False, False, file_path, args.conversations, args.llm_latency)
+        run("fast path", True, False, file_path, args.conversations, args.llm_latency)
+        run("combined", True, True, file_path, args.conversations, args.llm_latency)
+
+
+if __name__ == "__main__":
+    main()
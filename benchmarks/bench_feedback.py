@@ -0,0 +1,102 @@
+"""
+Feedback write throughput and lost writes with many concurrent writers.
+
+Every writer records the same number of clicks, spread over several
+processes with several threads each (Streamlit sessions in one server,
+plus more than one server on the same disk). "json" is the old
+save_feedback: load the whole JSON array, append, rewrite the file.
+"store" is FeedbackStore. It appends queued clicks to SQLite in batched
+WAL transactions. Lost records are the clicks that are not found on disk
+afterwards.
+
+Usage:
+    python benchmarks/bench_feedback.py --processes 4 --threads 8 --clicks 200
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feedback_store import FeedbackStore
+
+RESPONSE = "Based on the search results, the contract lists surcharges per zone. " * 10
+
+
+def legacy_save(directory: str, question: str) -> None:
+    """The pre-store save_feedback, minus Streamlit."""
+    json_file = os.path.join(directory, "liked.json")
+    existing_data = []
+    if os.path.exists(json_file):
+        try:
+            with open(json_file, "r") as f:
+                existing_data = json.load(f)
+        except json.JSONDecodeError:
+            existing_data = []
+    existing_data.append({"user_input": question, "assistant_response": RESPONSE, "timestamp": ""})
+    with open(json_file, "w") as f:
+        json.dump(existing_data, f, indent=2)
+
+
+def _process(backend: str, directory: str, process: int, threads: int, clicks: int) -> None:
+    store = FeedbackStore(os.path.join(directory, "feedback.sqlite"), legacy_dir=None) if backend == "store" else None
+
+    def writer(thread: int) -> None:
+        for click in range(clicks):
+            question = f"Question {process}-{thread}-{click}"
+            if store is not None:
+                store.record(question, RESPONSE, "liked")
+            else:
+                legacy_save(directory, question)
+
+    workers = [threading.Thread(target=writer, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if store is not None:
+        store.flush()
+
+
+def stored(backend: str, directory: str) -> int:
+    if backend == "store":
+        return FeedbackStore(os.path.join(directory, "feedback.sqlite"), legacy_dir=None).counts()["liked"]
+    try:
+        with open(os.path.join(directory, "liked.json")) as f:
+            return len(json.load(f))
+    except (OSError, json.JSONDecodeError):
+        return 0  # a concurrent rewrite left the file truncated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--clicks", type=int, default=200, help="clicks per writer thread")
+    args = parser.parse_args()
+
+    expected = args.processes * args.threads * args.clicks
+    print(f"{args.processes} processes x {args.threads} threads x {args.clicks} clicks = {expected:,} records")
+    for backend in ("json", "store"):
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            processes = [
+                multiprocessing.Process(target=_process, args=(backend, directory, n, args.threads, args.clicks))
+                for n in range(args.processes)
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            elapsed = time.perf_counter() - start
+            found = stored(backend, directory)
+            print(f"{backend:<6} {elapsed:8.2f}s  {expected / elapsed:10,.0f} records/s  lost {expected - found:,}")
+
+
+if __name__ == "__main__":
+    main()
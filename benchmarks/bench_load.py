@@ -0,0 +1,125 @@
+"""
+Load test for the CSV pipeline: N simulated users against a local fake LLM.
+
+Every user asks --questions questions one after another in its own
+conversation. In "async" mode all users share the async engine and its
+fair scheduler; in "threads" mode each user gets a thread running the
+synchronous pipeline, which is how Streamlit sessions behaved before.
+The answer cache is disabled, so every request makes its LLM calls
+instead of replaying the first user's answer.
+
+Usage:
+    python benchmarks/bench_load.py --users 50 --questions 5 --llm-latency 0.5
+    python benchmarks/bench_load.py --mode threads --users 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ["LANGSMITH_TRACING"] = "false"
+
+import numpy as np
+import pandas as pd
+
+import csv_agent
+from answer_cache import AnswerCache
+from async_engine import async_engine
+
+
+class FakeMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeLLM:
+    """Sleeps for a fixed latency per call, like a remote model would."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def _answer(self, prompt) -> FakeMessage:
+        if "Generate a Python code snippet" in str(prompt):
+            return FakeMessage("df['price'].sum()")
+        return FakeMessage("What is the total price?")
+
+    def invoke(self, prompt):
+        time.sleep(self.latency)
+        return self._answer(prompt)
+
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(self.latency)
+        return self._answer(prompt)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_async(file_path: str, users: int, questions: int):
+    latencies = []
+
+    async def user(n: int):
+        for _ in range(questions):
+            start = time.perf_counter()
+            await csv_agent.arun_csv_chat_agent(file_path, "What is the total price?", f"user-{n}")
+            latencies.append(time.perf_counter() - start)
+
+    async def main():
+        await asyncio.gather(*(user(n) for n in range(users)))
+
+    async_engine.run(main())
+    return latencies
+
+
+def run_threads(file_path: str, users: int, questions: int):
+    latencies = []
+
+    def user(n: int):
+        for _ in range(questions):
+            start = time.perf_counter()
+            csv_agent.run_csv_chat_agent(file_path, "What is the total price?", f"user-{n}")
+            latencies.append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(users) as pool:
+        list(pool.map(user, range(users)))
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["async", "threads"], default="async")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds per fake LLM call")
+    args = parser.parse_args()
+
+    csv_agent.client_registry.register(csv_agent.GEMINI_CSV, lambda: FakeLLM(args.llm_latency))
+    # Every user asks the same question; measure the pipeline, not cache hits
+    csv_agent.answer_cache = AnswerCache(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "orders.csv")
+        pd.DataFrame({"price": np.arange(1000) * 1.5}).to_csv(file_path, index=False)
+
+        start = time.perf_counter()
+        runner = run_async if args.mode == "async" else run_threads
+        latencies = runner(file_path, args.users, args.questions)
+        wall = time.perf_counter() - start
+
+    print(f"mode={args.mode} users={args.users} questions/user={args.questions} llm_latency={args.llm_latency}s")
+    print(f"requests: {len(latencies)}  throughput: {len(latencies) / wall:.2f} req/s")
+    print(
+        f"latency p50 {statistics.median(latencies):.3f}s  "
+        f"p95 {percentile(latencies, 0.95):.3f}s  p99 {percentile(latencies, 0.99):.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Cold load time and peak RSS for CSV, XLSX and Arrow sidecar files.
+
+Each load runs in a fresh subprocess, so the in-process DataFrame cache
+never kicks in and peak RSS covers exactly one load (plus interpreter and
+library import overhead, which is the same for every format).
+
+Usage:
+    python benchmarks/bench_sidecar.py --rows 10000 1000000 10000000
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from dtype_optimizer import optimize_dtypes
+from sidecar import read_sidecar, read_source_file, write_sidecar
+
+# Excel worksheets cannot hold more rows than this
+XLSX_MAX_ROWS = 1_048_575
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    """Synthetic order export resembling the files users upload."""
+    rng = np.random.default_rng(0)
+    products = np.array([f"Prodotto {i} - Formato {i % 7 * 100} gr" for i in range(500)])
+    carriers = np.array(["GLS", "TNT", "UPS", "DHL", "FEDEX", "POSTE"])
+    return pd.DataFrame({
+        "order_id": np.arange(rows),
+        "order_date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+        "product": products[rng.integers(0, len(products), rows)],
+        "carrier": carriers[rng.integers(0, len(carriers), rows)],
+        "quantity": rng.integers(1, 20, rows),
+        "price": rng.random(rows).round(2) * 100,
+    })
+
+
+def _child(loader: str, path: str) -> None:
+    start = time.perf_counter()
+    df = read_sidecar(path) if loader == "sidecar" else read_source_file(path)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{elapsed:.4f} {peak_kb} {len(df)}")
+
+
+def measure(loader: str, path: str):
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", loader, path],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return float(out[0]), int(out[1]) / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(*args.child)
+        return
+
+    print(f"{'rows':>10} {'format':>8} {'load s':>9} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            df = make_frame(rows)
+            csv_path = os.path.join(tmp, f"orders_{rows}.csv")
+            df.to_csv(csv_path, index=False)
+            write_sidecar(csv_path, *optimize_dtypes(read_source_file(csv_path)))
+            cases = [("csv", csv_path), ("sidecar", csv_path)]
+
+            if rows <= XLSX_MAX_ROWS:
+                xlsx_path = os.path.join(tmp, f"orders_{rows}.xlsx")
+                df.to_excel(xlsx_path, index=False)
+                cases.insert(1, ("xlsx", xlsx_path))
+            else:
+                print(f"{rows:>10} {'xlsx':>8} {'skipped (exceeds Excel row limit)':>22}")
+
+            for name, path in cases:
+                loader = "sidecar" if name == "sidecar" else "source"
+                seconds, peak_mb = measure(loader, path)
+                print(f"{rows:>10} {name:>8} {seconds:>9.3f} {peak_mb:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Cold start of the Streamlit app: time to the first rendered page and to a ready chat stack.
+
+Each run is a fresh interpreter that executes app.py once through
+Streamlit's AppTest harness, the same script run a new browser session
+triggers. "lazy" is the app as shipped: the mode's stack (llm for PDF,
+csv_agent for CSV) is imported in the background after the page is
+rendered. "eager" imports the stack before the first run, which is how
+the app started when it imported both stacks at the top.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STACKS = {"PDF": "llm", "CSV": "csv_agent"}
+
+
+def _child(mode: str, variant: str) -> None:
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    from streamlit.testing.v1 import AppTest
+
+    if variant == "eager":
+        __import__(STACKS[mode])
+    app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=300)
+    app.session_state["chat_mode"] = mode
+    app.run()
+    painted = time.perf_counter()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    for thread in threading.enumerate():
+        if thread.name.startswith("preload-"):
+            thread.join()
+    ready = time.perf_counter()
+    print(json.dumps({"paint": painted - start, "ready": ready - start}))
+
+
+def measure(mode: str, variant: str):
+    proc = subprocess.run(
+        [sys.executable, __file__, "--child", mode, variant],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(*args.child)
+        return
+
+    for mode in STACKS:
+        for variant in ("eager", "lazy"):
+            results = [measure(mode, variant) for _ in range(args.runs)]
+            paint = statistics.median(r["paint"] for r in results)
+            ready = statistics.median(r["ready"] for r in results)
+            print(f"{mode:<4} {variant:<6} first page {paint:6.2f}s   {STACKS[mode]} ready {ready:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Query latency and recall@k of the local vector index on synthetic embeddings.
+
+Clustered 1024-d vectors (the size of Cohere embed-multilingual-v3.0) are
+loaded into a LocalVectorIndex. Queries go through exact NumPy search and,
+when hnswlib is installed, through the HNSW graph. Recall is measured
+against the exact top-k. The default 3,000 vectors is roughly what the
+current 13 contract PDFs produce at 512-character chunks.
+
+Usage:
+    python benchmarks/bench_vector_store.py --vectors 3000 100000 --queries 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from vector_store import LocalVectorIndex
+
+DIM = 1024
+
+
+def make_vectors(count: int, rng: np.random.Generator) -> np.ndarray:
+    """Vectors scattered around a few hundred topic centres, like chunk embeddings of related documents."""
+    centres = rng.normal(size=(max(1, count // 50), DIM)).astype(np.float32)
+    return centres[rng.integers(0, len(centres), count)] + 0.5 * rng.normal(size=(count, DIM)).astype(np.float32)
+
+
+def measure(index: LocalVectorIndex, queries: np.ndarray, top_k: int):
+    timings, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        matches = index.query(query.tolist(), top_k=top_k, namespace="bench")["matches"]
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append({m["id"] for m in matches})
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1], results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, nargs="+", default=[3000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    try:
+        import hnswlib  # noqa: F401
+        has_hnsw = True
+    except ImportError:
+        has_hnsw = False
+        print("hnswlib not installed: reporting exact search only")
+
+    rng = np.random.default_rng(0)
+    for count in args.vectors:
+        vectors = make_vectors(count, rng)
+        queries = vectors[rng.integers(0, count, args.queries)] + 0.1 * rng.normal(size=(args.queries, DIM)).astype(np.float32)
+        with tempfile.TemporaryDirectory() as tmp:
+            exact = LocalVectorIndex(tmp, ann_min_vectors=count + 1)
+            start = time.perf_counter()
+            for offset in range(0, count, 1000):
+                exact.upsert(
+                    [{"id": str(i), "values": vectors[i].tolist(), "metadata": {}} for i in range(offset, min(count, offset + 1000))],
+                    namespace="bench",
+                )
+            exact.flush()
+            load = time.perf_counter() - start
+            median, p95, truth = measure(exact, queries, args.top_k)
+            print(f"{count:>9,} vectors  exact  median {median:7.3f} ms  p95 {p95:7.3f} ms  (load {load:.1f}s)")
+
+            if has_hnsw:
+                ann = LocalVectorIndex(tmp, ann_min_vectors=0)
+                start = time.perf_counter()
+                ann.query(queries[0].tolist(), top_k=args.top_k, namespace="bench")
+                build = time.perf_counter() - start
+                median, p95, found = measure(ann, queries, args.top_k)
+                recall = sum(len(a & b) for a, b in zip(truth, found)) / sum(len(t) for t in truth)
+                print(
+                    f"{count:>9,} vectors  hnsw   median {median:7.3f} ms  p95 {p95:7.3f} ms  "
+                    f"recall@{args.top_k} {recall:.3f}  (build {build:.1f}s)"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Summarize `python -X importtime` for the app's modules.
+
+Each module is imported in a fresh interpreter with -X importtime. The
+report shows the total import time and the slowest top-level packages by
+cumulative time, so a regression (e.g. pandas creeping back into the PDF
+path) is visible at a glance. Times are cumulative: a local module's line
+includes the packages it pulls in.
+
+Usage:
+    python benchmarks/importtime_report.py async_engine llm csv_agent --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _timings(code: str):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{code} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    timings = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():  # skips the header line
+            timings.append((int(cumulative) / 1e6, name))
+    return timings
+
+
+def import_times(module: str):
+    """(seconds to import ``module``, {package: cumulative seconds of its imports below ``module``})."""
+    # Interpreter startup imports come first; they are the same for every module
+    startup = len(_timings("pass"))
+    packages = defaultdict(float)
+    total = 0.0
+    stack = []
+    # Entries are printed children-first; walking backwards visits each parent before its children
+    for seconds, name in reversed(_timings(f"import {module}")[startup:]):
+        depth = len(name) - len(name.lstrip())
+        package = name.strip().split(".")[0]
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        if not stack:
+            total += seconds
+        elif stack[-1][1] != package:
+            # Count a package where another one first pulls it in, not again for its own submodules
+            packages[package] += seconds
+        stack.append((depth, package))
+    packages.pop(module.split(".")[0], None)
+    return total, packages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=["async_engine", "llm", "csv_agent"])
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        try:
+            total, packages = import_times(module)
+        except RuntimeError as e:
+            print(e)
+            continue
+        print(f"import {module}: {total:.3f}s")
+        for package, seconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {seconds:8.3f}s  {package}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
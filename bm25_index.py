@@ -0,0 +1,143 @@
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BM25_INDEX_PATH = os.getenv("BM25_INDEX_PATH", "bm25_index.json")
+
+# Standard Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Casefolded word tokens; numbers and codes like "GLS" or "2024" are kept as-is."""
+    return _TOKEN.findall(text.casefold())
+
+
+class BM25Index:
+    """
+    In-process BM25 inverted index over the same chunks as the vector store.
+
+    Chunk ids, text and metadata are persisted as JSON; postings are rebuilt
+    in memory on load, which takes well under a second for a few thousand
+    chunks. Exact tokens such as carrier names and tariff codes that dense
+    embeddings blur are matched literally here.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._docs: Dict[str, Tuple[str, Dict]] = {}
+        self._terms: Dict[str, Counter] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._dirty = False
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for chunk_id, (text, metadata) in json.load(f).items():
+                    self._add(chunk_id, text, metadata)
+
+    def _add(self, chunk_id: str, text: str, metadata: Dict) -> None:
+        terms = Counter(tokenize(text))
+        self._docs[chunk_id] = (text, metadata)
+        self._terms[chunk_id] = terms
+        self._lengths[chunk_id] = sum(terms.values())
+        self._total_length += self._lengths[chunk_id]
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[chunk_id] = count
+
+    def add(self, chunks: Iterable[Tuple[str, str, Dict]]) -> int:
+        """Index (chunk_id, text, metadata) triples not yet present. Returns how many were added."""
+        added = 0
+        with self._lock:
+            self._load()
+            for chunk_id, text, metadata in chunks:
+                if chunk_id not in self._docs:
+                    self._add(chunk_id, text, metadata)
+                    added += 1
+            self._dirty = self._dirty or bool(added)
+        return added
+
+    def remove(self, chunk_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._load()
+            for chunk_id in chunk_ids:
+                terms = self._terms.pop(chunk_id, None)
+                if terms is None:
+                    continue
+                del self._docs[chunk_id]
+                self._total_length -= self._lengths.pop(chunk_id)
+                for term in terms:
+                    postings = self._postings[term]
+                    del postings[chunk_id]
+                    if not postings:
+                        del self._postings[term]
+                self._dirty = True
+
+    def contains_all(self, chunk_ids: Iterable[str]) -> bool:
+        with self._lock:
+            self._load()
+            return all(chunk_id in self._docs for chunk_id in chunk_ids)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        with self._lock:
+            self._load()
+            return chunk_id in self._docs
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float, str, Dict]]:
+        """Best-matching chunks as (chunk_id, score, text, metadata), highest score first."""
+        with self._lock:
+            self._load()
+            if not self._docs:
+                return []
+            count = len(self._docs)
+            average_length = self._total_length / count
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings.items():
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[chunk_id] / average_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            return [(chunk_id, score, *self._docs[chunk_id]) for chunk_id, score in best]
+
+    def flush(self) -> None:
+        """Persist the chunk store if it changed since the last flush."""
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({chunk_id: [text, metadata] for chunk_id, (text, metadata) in self._docs.items()}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._docs)
+
+
+# Shared index instance
+bm25_index = BM25Index(BM25_INDEX_PATH)
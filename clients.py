@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Names of the shared clients
+COHERE_EMBEDDINGS = "cohere_embeddings"
+PINECONE = "pinecone"
+PINECONE_INDEX = "pinecone_index"
+VECTOR_INDEX = "vector_index"
+RERANKER = "reranker"
+
+EMBEDDING_MODEL = "embed-multilingual-v3.0"
+PINECONE_INDEX_NAME = "italian-pdf-docs"
+PINECONE_NAMESPACE = "Test-1"
+
+# Vector store behind retrieval and ingestion: "pinecone" or "local" (in-process, see vector_store.py)
+VECTOR_STORE = os.getenv("VECTOR_STORE", "pinecone")
+# Multilingual cross-encoder for optional local reranking of retrieved chunks
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
+
+# Worker threads / HTTP connections the Pinecone client keeps open for reuse
+PINECONE_POOL_SIZE = int(os.getenv("PINECONE_POOL_SIZE", "8"))
+
+
+class ClientRegistry:
+    """
+    Thread-safe registry of long-lived API clients.
+
+    Each client is built once per process by its factory on first use and
+    then shared, so its HTTP connection pool (and TLS sessions) are reused
+    across requests. Factories can be replaced at any time, e.g. with local
+    fakes in tests; replacing one drops the instance it had built.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._health_checks: Dict[str, Callable[[Any], Any]] = {}
+        self._clients: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        # Re-entrant: a factory may fetch another client (the index needs the Pinecone client)
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any], health_check: Optional[Callable[[Any], Any]] = None) -> None:
+        """Register (or replace) the factory for ``name``."""
+        with self._lock:
+            self._factories[name] = factory
+            if health_check is not None:
+                self._health_checks[name] = health_check
+            else:
+                self._health_checks.pop(name, None)
+            self._clients.pop(name, None)
+            self._stats[name] = {"created": 0, "uses": 0, "errors": 0, "last_error": None, "healthy": None}
+
+    def get(self, name: str) -> Any:
+        """Return the shared client for ``name``, creating it on first use."""
+        client = self._clients.get(name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(name)
+                if client is None:
+                    if name not in self._factories:
+                        raise KeyError(f"No client registered under '{name}'")
+                    client = self._factories[name]()
+                    self._clients[name] = client
+                    self._stats[name]["created"] += 1
+        with self._lock:
+            self._stats[name]["uses"] += 1
+        return client
+
+    @contextmanager
+    def use(self, name: str):
+        """Context manager yielding a shared client and counting errors raised while using it."""
+        client = self.get(name)
+        try:
+            yield client
+        except Exception as e:
+            self.record_error(name, e)
+            raise
+
+    def record_error(self, name: str, error: Exception) -> None:
+        with self._lock:
+            stats = self._stats[name]
+            stats["errors"] += 1
+            stats["last_error"] = f"{time.strftime('%Y-%m-%d %H:%M:%S')} {type(error).__name__}: {error}"
+            stats["healthy"] = False
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Drop built clients so the next ``get`` recreates them (e.g. after a credentials change)."""
+        with self._lock:
+            if name is None:
+                self._clients.clear()
+            else:
+                self._clients.pop(name, None)
+
+    def check_health(self) -> Dict[str, bool]:
+        """Run the health check of every client built so far and return name -> healthy."""
+        with self._lock:
+            built = [(name, client) for name, client in self._clients.items()]
+        results = {}
+        for name, client in built:
+            check = self._health_checks.get(name)
+            if check is None:
+                continue
+            try:
+                check(client)
+                healthy = True
+            except Exception as e:
+                self.record_error(name, e)
+                healthy = False
+            with self._lock:
+                self._stats[name]["healthy"] = healthy
+            results[name] = healthy
+        return results
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-client creation/use/error counters, health and pool size."""
+        with self._lock:
+            report = {name: dict(stats, built=name in self._clients) for name, stats in self._stats.items()}
+        if PINECONE_INDEX in report:
+            report[PINECONE_INDEX]["pool_size"] = PINECONE_POOL_SIZE
+        return report
+
+
+def _cohere_embeddings():
+    from langchain_cohere import CohereEmbeddings
+    return CohereEmbeddings(model=EMBEDDING_MODEL)
+
+
+def _pinecone():
+    from pinecone import Pinecone
+    return Pinecone(api_key=os.getenv("PINECONE_API_KEY"), pool_threads=PINECONE_POOL_SIZE)
+
+
+def _pinecone_index():
+    return client_registry.get(PINECONE).Index(
+        PINECONE_INDEX_NAME,
+        pool_threads=PINECONE_POOL_SIZE,
+        connection_pool_maxsize=PINECONE_POOL_SIZE,
+    )
+
+
+def _vector_index():
+    if VECTOR_STORE == "local":
+        from vector_store import LocalVectorIndex, VECTOR_STORE_DIR
+        return LocalVectorIndex(VECTOR_STORE_DIR)
+    return client_registry.get(PINECONE_INDEX)
+
+
+def _reranker():
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(RERANK_MODEL)
+
+
+# Shared registry instance
+client_registry = ClientRegistry()
+client_registry.register(COHERE_EMBEDDINGS, _cohere_embeddings)
+client_registry.register(PINECONE, _pinecone, health_check=lambda pc: pc.list_indexes())
+client_registry.register(PINECONE_INDEX, _pinecone_index, health_check=lambda index: index.describe_index_stats())
+client_registry.register(VECTOR_INDEX, _vector_index, health_check=lambda index: index.describe_index_stats())
+client_registry.register(RERANKER, _reranker)
@@ -0,0 +1,208 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, Tuple
+
+from dotenv import load_dotenv
+from langchain_core.messages import BaseMessage, RemoveMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+from prompts import estimate_tokens
+
+load_dotenv()
+
+# Conversation window kept in graph state (and therefore in every prompt)
+CONVERSATION_MAX_TURNS = int(os.getenv("CONVERSATION_MAX_TURNS", "10"))
+CONVERSATION_MAX_TOKENS = int(os.getenv("CONVERSATION_MAX_TOKENS", "8000"))
+# Threads untouched for this long are dropped from the checkpointer
+CONVERSATION_IDLE_TTL_S = float(os.getenv("CONVERSATION_IDLE_TTL_S", "3600"))
+CONVERSATION_MAX_THREADS = int(os.getenv("CONVERSATION_MAX_THREADS", "1000"))
+# Persist checkpoints as <dir>/<graph name>.sqlite
+CONVERSATION_DB_DIR = os.getenv("CONVERSATION_DB_DIR", "")
+
+
+def trim_history(history: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Keep the most recent (question, answer) turns within the turn and token window."""
+    history = history[-CONVERSATION_MAX_TURNS:]
+    while len(history) > 1 and sum(estimate_tokens(q) + estimate_tokens(a) for q, a in history) > CONVERSATION_MAX_TOKENS:
+        history = history[1:]
+    return history
+
+
+def _message_tokens(message: BaseMessage) -> int:
+    return estimate_tokens(str(message.content)) + estimate_tokens(str(getattr(message, "tool_calls", "") or ""))
+
+
+def window_messages(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """
+    Most recent whole turns of a ReAct conversation within the turn and token window.
+
+    A turn starts at a human message, so tool calls and their results are never
+    split. Only the latest system message is kept: the agent adds one per turn.
+    """
+    system = [m for m in messages if m.type == "system"][-1:]
+    conversation = [m for m in messages if m.type != "system"]
+    starts = [i for i, m in enumerate(conversation) if m.type == "human"][-CONVERSATION_MAX_TURNS:]
+    if not starts:
+        return system + conversation
+    tokens = [_message_tokens(m) for m in conversation]
+    base = sum(_message_tokens(m) for m in system)
+    # The current turn always stays, however long it is
+    while len(starts) > 1 and base + sum(tokens[starts[0]:]) > CONVERSATION_MAX_TOKENS:
+        starts.pop(0)
+    return system + conversation[starts[0]:]
+
+
+def trim_agent_messages(state: dict) -> dict:
+    """pre_model_hook for create_react_agent: drop old turns from the stored state, not just the prompt."""
+    messages = state["messages"]
+    kept = window_messages(messages)
+    if len(kept) == len(messages):
+        return {"llm_input_messages": messages}
+    return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *kept]}
+
+
+class _EvictingSaver(ABC):
+    """
+    Checkpointer mixin that keeps only the latest checkpoint of each thread and
+    drops threads that have been idle for ``idle_ttl`` seconds, or the least
+    recently used ones beyond ``max_threads``.
+
+    Subclasses implement the storage side in ``_prune`` and ``_drop_threads``.
+    """
+
+    def __init__(self, *args, idle_ttl: float = CONVERSATION_IDLE_TTL_S, max_threads: int = CONVERSATION_MAX_THREADS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.idle_ttl = idle_ttl
+        self.max_threads = max_threads
+        self._last_seen: "OrderedDict[str, float]" = OrderedDict()
+        self._eviction_lock = threading.Lock()
+        self.evicted = 0
+
+    def _touch(self, thread_id: str) -> None:
+        with self._eviction_lock:
+            self._last_seen[thread_id] = time.monotonic()
+            self._last_seen.move_to_end(thread_id)
+
+    def _evict(self) -> None:
+        victims = []
+        deadline = time.monotonic() - self.idle_ttl
+        with self._eviction_lock:
+            # Oldest first, so the scan stops at the first thread still in use
+            while self._last_seen:
+                thread_id, last_seen = next(iter(self._last_seen.items()))
+                if last_seen >= deadline and len(self._last_seen) <= self.max_threads:
+                    break
+                self._last_seen.popitem(last=False)
+                victims.append(thread_id)
+        if victims:
+            self._drop_threads(set(victims))
+            self.evicted += len(victims)
+
+    def get_tuple(self, config):
+        self._touch(config["configurable"]["thread_id"])
+        return super().get_tuple(config)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        configurable = saved["configurable"]
+        self._prune(configurable["thread_id"], configurable.get("checkpoint_ns", ""), configurable["checkpoint_id"])
+        self._touch(configurable["thread_id"])
+        self._evict()
+        return saved
+
+    def stats(self):
+        return {"threads": len(self._last_seen), "evicted": self.evicted}
+
+    @abstractmethod
+    def _prune(self, thread_id: str, checkpoint_ns: str, keep_id: str) -> None:
+        """Delete every checkpoint of the thread's namespace except ``keep_id``."""
+
+    @abstractmethod
+    def _drop_threads(self, thread_ids: set) -> None:
+        """Delete everything stored for these threads."""
+
+
+class BoundedMemorySaver(_EvictingSaver, MemorySaver):
+    """In-process checkpointer whose memory stays flat however long the server runs."""
+
+    def _prune(self, thread_id: str, checkpoint_ns: str, keep_id: str) -> None:
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        old_ids = [checkpoint_id for checkpoint_id in checkpoints if checkpoint_id != keep_id]
+        if not old_ids:
+            return
+        blobs = getattr(self, "blobs", None)
+        kept_versions = set()
+        if blobs is not None:
+            kept_versions = set(self.serde.loads_typed(checkpoints[keep_id][0])["channel_versions"].items())
+        for checkpoint_id in old_ids:
+            saved = checkpoints.pop(checkpoint_id)
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            if blobs is not None:
+                # Channel values no longer referenced by the kept checkpoint
+                for channel, version in self.serde.loads_typed(saved[0])["channel_versions"].items():
+                    if (channel, version) not in kept_versions:
+                        blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+
+    def _drop_threads(self, thread_ids: set) -> None:
+        for thread_id in thread_ids:
+            self.storage.pop(thread_id, None)
+        for store in (self.writes, getattr(self, "blobs", {})):
+            for key in [key for key in list(store) if key[0] in thread_ids]:
+                store.pop(key, None)
+
+
+def _sqlite_saver(path: str):
+    """SQLite-backed evicting checkpointer; threads found on disk start a fresh idle timer."""
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError as e:
+        raise ImportError("CONVERSATION_DB_DIR needs the langgraph-checkpoint-sqlite package.") from e
+
+    class BoundedSqliteSaver(_EvictingSaver, SqliteSaver):
+        def _prune(self, thread_id: str, checkpoint_ns: str, keep_id: str) -> None:
+            with self.cursor() as cur:
+                for table in ("checkpoints", "writes"):
+                    cur.execute(
+                        f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                        (thread_id, checkpoint_ns, keep_id),
+                    )
+
+        def _drop_threads(self, thread_ids: set) -> None:
+            with self.cursor() as cur:
+                for table in ("checkpoints", "writes"):
+                    cur.executemany(f"DELETE FROM {table} WHERE thread_id = ?", [(t,) for t in thread_ids])
+
+        # SqliteSaver is sync-only; the async graph paths run it off the event loop
+        async def aget_tuple(self, config):
+            return await asyncio.to_thread(self.get_tuple, config)
+
+        async def alist(self, config, *, filter=None, before=None, limit=None):
+            for item in await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit))):
+                yield item
+
+        async def aput(self, config, checkpoint, metadata, new_versions):
+            return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+        async def aput_writes(self, config, writes, task_id, task_path=""):
+            return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    saver = BoundedSqliteSaver(sqlite3.connect(path, check_same_thread=False))
+    with saver.cursor(transaction=False) as cur:
+        cur.execute("SELECT DISTINCT thread_id FROM checkpoints")
+        for (thread_id,) in cur.fetchall():
+            saver._touch(thread_id)
+    return saver
+
+
+def create_checkpointer(name: str):
+    """Checkpointer for one graph: bounded in memory, or SQLite when CONVERSATION_DB_DIR is set."""
+    if CONVERSATION_DB_DIR:
+        os.makedirs(CONVERSATION_DB_DIR, exist_ok=True)
+        return _sqlite_saver(os.path.join(CONVERSATION_DB_DIR, f"{name}.sqlite"))
+    return BoundedMemorySaver()
@@ -1,160 +1,459 @@
+import asyncio
 import os
+import threading
 from langsmith import Client, traceable
 import pandas as pd
 from dotenv import load_dotenv
-from typing import TypedDict, List
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_experimental.tools import PythonAstREPLTool
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, TypedDict, List, Optional
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
-import numpy as np
 from termcolor import colored
+from clients import client_registry
+from metrics import metrics
+from conversation_memory import create_checkpointer, trim_history
+from async_engine import llm_slot
+from sandbox import QueryResult, execute_code, query_error, sandbox_pool, truncate_result
+from answer_cache import ANSWER_CACHE_REUSE_RESULT, answer_cache, file_content_hash
+from data_cache import dataframe_cache, file_version
+from duckdb_engine import DuckDBAccessError, choose_engine, profile_file, run_sql
+from dataset_profile import profile_for_entry
+from question_router import CSV_COMBINED_INTERPRET, CSV_FAST_PATH, is_standalone_question
 from prompts import (
     interpret_question_prompt,
+    interpret_and_generate_prompt,
+    interpret_and_generate_sql_prompt,
     generate_query_prompt,
+    generate_sql_prompt,
     format_response_prompt,
 )
 
 # Load environment variables
 load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-if not GOOGLE_API_KEY:
-    raise ValueError("GOOGLE_API_KEY not found in environment variables.")
-
-# Initialize the LLM
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash",
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=10,
-    api_key=GOOGLE_API_KEY,
-)
+
+
+def _gemini_csv():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    google_api_key = os.getenv("GOOGLE_API_KEY")
+    if not google_api_key:
+        raise ValueError("GOOGLE_API_KEY not found in environment variables.")
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.0-flash",
+        temperature=0,
+        max_tokens=None,
+        timeout=None,
+        max_retries=10,
+        api_key=google_api_key,
+    )
+
+
+# The LLM is built on the first question, not at import
+GEMINI_CSV = "gemini_csv"
+client_registry.register(GEMINI_CSV, _gemini_csv)
 langsmith_api_key = os.getenv("LANGSMITH_API_KEY")
 custom_client = Client(api_key=langsmith_api_key)
 
-# Shared MemorySaver instance
-memory = MemorySaver()
+# Shared checkpointer: latest state per conversation, idle conversations evicted
+memory = create_checkpointer("csv")
 
 LANGSMITH_TRACING = True
 
-@traceable(client=custom_client, run_type="llm", name="CSV-Agent", project_name="CSV_TO_CHAT")
-def run_csv_chat_agent(file_path: str, user_question: str, thread_id: str) -> str:
-    """
-    Runs a chat agent that processes a user question against a CSV file, formats the final response,
-    and maintains conversation history for context-aware responses.
-    """
-    # Load the dataframe
-    if file_path.endswith('.xlsx'):
-        df = pd.read_excel(file_path)
-    elif file_path.endswith('.csv'):
-        df = pd.read_csv(file_path)
-    else:
-        raise ValueError("Unsupported file format. Use .xlsx or .csv.")
-
-    # Create the Python REPL tool
-    tool = PythonAstREPLTool(locals={"df": df})
-    df_5_rows = df.head().to_markdown()
-    columns = df.columns.tolist()  # Store columns for reuse
-
-    # Prepare dataframe info for prompts
-    df_info = f"""
-    DataFrame Information:
-    - Shape: {df.shape}
-    - Columns: {', '.join(columns)}
-    - Data Types:
-    {df.dtypes.to_string()}
-    First 5 rows:
-    {df.head().to_markdown()}
-    """    
+# Run generated pandas code in the sandbox worker pool (set CSV_SANDBOX=0 to run it in-process)
+CSV_SANDBOX = os.getenv("CSV_SANDBOX", "1") != "0"
+
+
+@dataclass
+class CsvContext:
+    """Per-file objects the graph nodes work with, passed in through the run config."""
+    df: Optional[pd.DataFrame]  # None when the file is queried in place by DuckDB
+    version: tuple  # (path, mtime_ns, size) of the loaded file
+    content_hash: str
+    namespace: Optional[dict]  # globals of the in-process REPL, holding `df`
+    df_info: str
+    df_5_rows: str
+    csv_description: str
+    engine: str = "pandas"  # "pandas": generated code is pandas; "duckdb": it is SQL
+
+
+def build_csv_context(file_path: str, engine: Optional[str] = None) -> CsvContext:
+    """Loads a data file and prepares the REPL namespace and prompt snippets for it."""
+    if choose_engine(file_path, engine) == "duckdb":
+        import duckdb
+
+        try:
+            return _build_duckdb_context(file_path)
+        except (DuckDBAccessError, duckdb.Error, OSError) as e:
+            print(colored(f"DuckDB could not open {file_path} ({e}); querying it with pandas instead", "yellow"))
+
+    # Load the dataframe and its profile (computed once per file version, then served from cache)
+    entry = dataframe_cache.get_entry(file_path)
+    df = entry.df.copy(deep=False)
+    profile = profile_for_entry(entry)
+
+    # Namespace the generated code runs in when it isn't sent to the sandbox
+    namespace = {"df": df}
+
+    # Prompt snippets, kept within a token budget however wide the file is
+    df_info = profile.render()
+    df_5_rows = profile.render_sample_rows()
 
     csv_description = f"This is a csv file"
     # print(colored(f"The csv description is: {csv_description}", "red"))
+    return CsvContext(df=df, version=entry.key, content_hash=file_content_hash(entry), namespace=namespace, df_info=df_info, df_5_rows=df_5_rows, csv_description=csv_description)
 
 
-    # Define node functions
-    def interpret_question_node(state: dict) -> dict:
-        """Rephrases the user's question based on conversation history."""
-        question = state["question"]
-        history = state.get("history", [])
-        history_str = "\n".join([f"User: {q}\nAssistant: {a}" for q, a in history[-5:]])
-        prompt = interpret_question_prompt.format(history_str=history_str, question=question, df_info=df_info, csv_description=csv_description)
-        response = llm.invoke(prompt)
-        standalone_question = response.content.strip()
-        print(colored(f"Standalone question: {standalone_question}", 'green'))
-        return {"standalone_question": standalone_question}
-
-
-    def generate_query_node(state: dict) -> dict:
-        """Generates the initial Python query based on the standalone question."""
-        standalone_question = state["standalone_question"]
-        prompt = generate_query_prompt.format(df_info=df_info, standalone_question=standalone_question, csv_description=csv_description)
-        response = llm.invoke(prompt)
-        query = response.content.strip()
-        print(colored(f"Generated query: {query}", 'blue'))
-        return {"query": query}
-
-    def execute_query_node(state: dict) -> dict:
-        """Executes the Python query on the DataFrame."""
-        query = state["query"]
-        try:
-            response = tool.run(query)
-            return {"response": str(response)}
-        except Exception as e:
-            return {"response": f"Error executing query: {str(e)}"}
-
-
-    def format_response_node(state: dict) -> dict:
-        """Formats the raw response and updates history."""
-        question = state["question"]
-        response = state["response"]
-        prompt = format_response_prompt.format(question=question, response=response, df_info=df_5_rows, csv_description=csv_description)
-        formatted_answer = llm.invoke(prompt).content.strip()
-        history = state.get("history", [])
-        history.append((question, formatted_answer))
-        return {"final_answer": formatted_answer, "history": history}
-
-
-
-
-    # Updated state structure
-    class GraphState(TypedDict):
-        history: List[tuple]
-        question: str
-        standalone_question: str
-        is_relevant: bool  # New field
-        query: str
-        response: str
-        grade: str
-        attempts: int
-        final_answer: str
-
-    # Build the workflow graph
+def _build_duckdb_context(file_path: str) -> CsvContext:
+    """Context for a file queried in place by DuckDB: nothing is loaded, the profile comes from one SUMMARIZE scan."""
+    profile = profile_file(file_path)
+    version = file_version(file_path)
+    # Hashing a file larger than RAM on every question would cost as much as
+    # the query, so cached answers are keyed by file version instead of content
+    content_hash = "duckdb:" + ":".join(str(part) for part in version)
+    return CsvContext(
+        df=None, version=version, content_hash=content_hash, namespace=None,
+        df_info=profile.render(), df_5_rows=profile.render_sample_rows(),
+        csv_description="This is a csv file", engine="duckdb",
+    )
+
+
+def _context(config: RunnableConfig) -> CsvContext:
+    return config["configurable"]["csv_context"]
+
+
+def route_question(state: dict) -> str:
+    """Entry router: rephrase only when the question may depend on earlier turns."""
+    if CSV_FAST_PATH and is_standalone_question(state["question"], state.get("history", [])):
+        return "use_question"
+    if CSV_COMBINED_INTERPRET:
+        return "interpret_and_generate"
+    return "interpret_question"
+
+
+def _history_str(state: dict) -> str:
+    history = state.get("history", [])
+    return "\n".join([f"User: {q}\nAssistant: {a}" for q, a in history[-5:]])
+
+
+def _interpret_question_prompt(state: dict, ctx: CsvContext):
+    return interpret_question_prompt.format(history_str=_history_str(state), question=state["question"], df_info=ctx.df_info, csv_description=ctx.csv_description)
+
+
+def _interpret_question_update(response, ctx: CsvContext) -> dict:
+    return _standalone_update(response.content.strip(), ctx)
+
+
+def _standalone_update(standalone_question: str, ctx: CsvContext) -> dict:
+    print(colored(f"Standalone question: {standalone_question}", 'green'))
+    update = {"standalone_question": standalone_question, "cache_hit": "none"}
+
+    # Same question already answered against this exact file content?
+    cached = answer_cache.get(ctx.content_hash, standalone_question)
+    if cached is not None:
+        update.update(query=cached.query, cache_hit="query")
+        if ANSWER_CACHE_REUSE_RESULT:
+            update.update(response=cached.response, cache_hit="result")
+        print(colored(f"Answer cache hit ({update['cache_hit']})", 'yellow'))
+    return update
+
+
+def route_after_interpret(state: dict) -> str:
+    """Skip query generation (and execution) when the answer cache had a hit."""
+    if state.get("cache_hit") == "result":
+        return "format_response"
+    if state.get("cache_hit") == "query":
+        return "execute_query"
+    return "generate_query"
+
+
+def _interpret_and_generate_prompt(state: dict, ctx: CsvContext):
+    prompt = interpret_and_generate_sql_prompt if ctx.engine == "duckdb" else interpret_and_generate_prompt
+    return prompt.format(history_str=_history_str(state), question=state["question"], df_info=ctx.df_info, csv_description=ctx.csv_description)
+
+
+def _interpret_and_generate_update(state: dict, response, ctx: CsvContext) -> dict:
+    text = response.content.strip()
+    head, sep, code = text.partition("Code:")
+    if not sep:
+        # Model ignored the format; treat the whole reply as code for the original question
+        head, code = "", text
+    standalone_question = head.replace("Standalone question:", "", 1).strip() or state["question"]
+    update = _standalone_update(standalone_question, ctx)
+    if update["cache_hit"] == "none":
+        update["query"] = code.strip()
+        print(colored(f"Generated query: {update['query']}", 'blue'))
+    return update
+
+
+def route_after_combined(state: dict) -> str:
+    return "format_response" if state.get("cache_hit") == "result" else "execute_query"
+
+
+def _generate_query_prompt(state: dict, ctx: CsvContext):
+    standalone_question = state["standalone_question"]
+    prompt = generate_sql_prompt if ctx.engine == "duckdb" else generate_query_prompt
+    return prompt.format(df_info=ctx.df_info, standalone_question=standalone_question, csv_description=ctx.csv_description)
+
+
+def _generate_query_update(response) -> dict:
+    query = response.content.strip()
+    print(colored(f"Generated query: {query}", 'blue'))
+    return {"query": query}
+
+
+def _run_query(ctx: CsvContext, query: str, cancel: threading.Event = None) -> QueryResult:
+    if ctx.engine == "duckdb":
+        return run_sql(ctx.version[0], query, cancel)
+    if CSV_SANDBOX:
+        return sandbox_pool.run(ctx.version, query, cancel)
+    try:
+        return QueryResult(True, truncate_result(execute_code(query, ctx.namespace)))
+    except Exception as e:
+        return query_error(f"{type(e).__name__}: {e}")
+
+
+def _execute_query(state: dict, ctx: CsvContext, cancel: threading.Event = None) -> dict:
+    result = _run_query(ctx, state["query"], cancel)
+    # Only successful results are cached; a failed query is regenerated next time
+    if result.ok:
+        answer_cache.put(ctx.content_hash, state["standalone_question"], state["query"], result.text)
+    return {"response": result.text}
+
+
+def _format_response_prompt(state: dict, ctx: CsvContext):
+    return format_response_prompt.format(question=state["question"], response=state["response"], df_info=ctx.df_5_rows, csv_description=ctx.csv_description)
+
+
+def _format_response_update(state: dict, response) -> dict:
+    formatted_answer = response.content.strip()
+    history = trim_history(state.get("history", []) + [(state["question"], formatted_answer)])
+    return {"final_answer": formatted_answer, "history": history}
+
+
+async def _ainvoke_llm(prompt, config: RunnableConfig):
+    """Async LLM call admitted through the shared scheduler, queued fairly per conversation."""
+    async with llm_slot(config["configurable"].get("thread_id", "default")):
+        return await client_registry.get(GEMINI_CSV).ainvoke(prompt)
+
+
+# Define node functions (sync versions run under invoke/stream, async ones under ainvoke/astream)
+@metrics.timed("csv_node_seconds", node="interpret_question")
+def interpret_question_node(state: dict, config: RunnableConfig) -> dict:
+    """Rephrases the user's question based on conversation history."""
+    ctx = _context(config)
+    response = client_registry.get(GEMINI_CSV).invoke(_interpret_question_prompt(state, ctx))
+    return _interpret_question_update(response, ctx)
+
+
+@metrics.timed("csv_node_seconds", node="interpret_question")
+async def ainterpret_question_node(state: dict, config: RunnableConfig) -> dict:
+    ctx = _context(config)
+    response = await _ainvoke_llm(_interpret_question_prompt(state, ctx), config)
+    return _interpret_question_update(response, ctx)
+
+
+@metrics.timed("csv_node_seconds", node="use_question")
+def use_question_node(state: dict, config: RunnableConfig) -> dict:
+    """Fast path: the question is already standalone, no LLM call needed."""
+    return _standalone_update(state["question"], _context(config))
+
+
+@metrics.timed("csv_node_seconds", node="interpret_and_generate")
+def interpret_and_generate_node(state: dict, config: RunnableConfig) -> dict:
+    """Rephrases the question and generates the pandas code in a single LLM call."""
+    ctx = _context(config)
+    response = client_registry.get(GEMINI_CSV).invoke(_interpret_and_generate_prompt(state, ctx))
+    return _interpret_and_generate_update(state, response, ctx)
+
+
+@metrics.timed("csv_node_seconds", node="interpret_and_generate")
+async def ainterpret_and_generate_node(state: dict, config: RunnableConfig) -> dict:
+    ctx = _context(config)
+    response = await _ainvoke_llm(_interpret_and_generate_prompt(state, ctx), config)
+    return _interpret_and_generate_update(state, response, ctx)
+
+
+@metrics.timed("csv_node_seconds", node="generate_query")
+def generate_query_node(state: dict, config: RunnableConfig) -> dict:
+    """Generates the initial Python query based on the standalone question."""
+    response = client_registry.get(GEMINI_CSV).invoke(_generate_query_prompt(state, _context(config)))
+    return _generate_query_update(response)
+
+
+@metrics.timed("csv_node_seconds", node="generate_query")
+async def agenerate_query_node(state: dict, config: RunnableConfig) -> dict:
+    response = await _ainvoke_llm(_generate_query_prompt(state, _context(config)), config)
+    return _generate_query_update(response)
+
+
+@metrics.timed("csv_node_seconds", node="execute_query")
+def execute_query_node(state: dict, config: RunnableConfig) -> dict:
+    """Executes the Python query on the DataFrame."""
+    return _execute_query(state, _context(config))
+
+
+@metrics.timed("csv_node_seconds", node="execute_query")
+async def aexecute_query_node(state: dict, config: RunnableConfig) -> dict:
+    # pandas work is CPU-bound; keep it off the event loop
+    cancel = threading.Event()
+    try:
+        return await asyncio.to_thread(_execute_query, state, _context(config), cancel)
+    except asyncio.CancelledError:
+        # Kills the sandbox worker instead of letting an abandoned query run on
+        cancel.set()
+        raise
+
+
+@metrics.timed("csv_node_seconds", node="format_response")
+def format_response_node(state: dict, config: RunnableConfig) -> dict:
+    """Formats the raw response and updates history."""
+    response = client_registry.get(GEMINI_CSV).invoke(_format_response_prompt(state, _context(config)))
+    return _format_response_update(state, response)
+
+
+@metrics.timed("csv_node_seconds", node="format_response")
+async def aformat_response_node(state: dict, config: RunnableConfig) -> dict:
+    response = await _ainvoke_llm(_format_response_prompt(state, _context(config)), config)
+    return _format_response_update(state, response)
+
+
+# Updated state structure
+class GraphState(TypedDict):
+    history: List[tuple]
+    question: str
+    standalone_question: str
+    is_relevant: bool  # New field
+    query: str
+    response: str
+    grade: str
+    attempts: int
+    final_answer: str
+    cache_hit: str  # "none", "query" or "result"; set on every turn by the first node
+
+
+def build_csv_graph(checkpointer=memory):
+    """Builds and compiles the CSV question-answering workflow."""
     graph = StateGraph(GraphState)
-    graph.add_node("interpret_question", interpret_question_node)
-    graph.add_node("generate_query", generate_query_node)
-    graph.add_node("execute_query", execute_query_node)
-    graph.add_node("format_response", format_response_node)
+    graph.add_node("interpret_question", RunnableLambda(interpret_question_node, afunc=ainterpret_question_node))
+    graph.add_node("use_question", RunnableLambda(use_question_node))
+    graph.add_node("interpret_and_generate", RunnableLambda(interpret_and_generate_node, afunc=ainterpret_and_generate_node))
+    graph.add_node("generate_query", RunnableLambda(generate_query_node, afunc=agenerate_query_node))
+    graph.add_node("execute_query", RunnableLambda(execute_query_node, afunc=aexecute_query_node))
+    graph.add_node("format_response", RunnableLambda(format_response_node, afunc=aformat_response_node))
 
     # Set entry point
-    graph.set_entry_point("interpret_question")
+    graph.set_conditional_entry_point(
+        route_question,
+        {"use_question": "use_question", "interpret_question": "interpret_question", "interpret_and_generate": "interpret_and_generate"},
+    )
 
     # Define edges
-    graph.add_edge("interpret_question", "generate_query")
+    for node in ("interpret_question", "use_question"):
+        graph.add_conditional_edges(
+            node,
+            route_after_interpret,
+            {"generate_query": "generate_query", "execute_query": "execute_query", "format_response": "format_response"},
+        )
+    graph.add_conditional_edges(
+        "interpret_and_generate",
+        route_after_combined,
+        {"execute_query": "execute_query", "format_response": "format_response"},
+    )
     graph.add_edge("generate_query", "execute_query")
     graph.add_edge("execute_query", "format_response")
     graph.add_edge("format_response", END)
 
     # Compile the graph
-    app = graph.compile(checkpointer=memory)
+    return graph.compile(checkpointer=checkpointer)
+
 
-    config = {"configurable": {"thread_id": thread_id}}
+# Compiled once and shared by every request and thread; per-file objects
+# travel in config["configurable"]["csv_context"].
+csv_app = build_csv_graph()
+
+
+@traceable(client=custom_client, run_type="llm", name="CSV-Agent", project_name="CSV_TO_CHAT")
+def run_csv_chat_agent(file_path: str, user_question: str, thread_id: str, engine: Optional[str] = None) -> str:
+    """
+    Runs a chat agent that processes a user question against a CSV file, formats the final response,
+    and maintains conversation history for context-aware responses.
+
+    ``engine`` is "pandas", "duckdb" or None to pick by file size (see duckdb_engine.choose_engine).
+    """
+    ctx = build_csv_context(file_path, engine)
+    config = {"configurable": {"thread_id": thread_id, "csv_context": ctx}}
     initial_state = {"question": user_question, "attempts": 0}
-    final_state = app.invoke(initial_state, config=config)
+    final_state = csv_app.invoke(initial_state, config=config)
     print(colored(f"Final state: {final_state}", "red"))
     return final_state["final_answer"]
 
+# Longest query result shown as an intermediate status while streaming
+STATUS_RESULT_MAX_CHARS = 500
+
+
+@traceable(client=custom_client, run_type="llm", name="CSV-Agent-stream", project_name="CSV_TO_CHAT")
+def stream_csv_chat_agent(file_path: str, user_question: str, thread_id: str, engine: Optional[str] = None) -> Iterator[dict]:
+    """
+    Streaming variant of run_csv_chat_agent.
+
+    Yields event dicts: {"type": "status", "label": ..., "content": ...} for the rephrased
+    question and the query result, {"type": "code", "content": ...} for the generated
+    pandas code (or SQL on the DuckDB engine), then {"type": "token", "content": ...} for each piece of the final answer.
+    """
+    ctx = build_csv_context(file_path, engine)
+    config = {"configurable": {"thread_id": thread_id, "csv_context": ctx}}
+    initial_state = {"question": user_question, "attempts": 0}
+    for mode, payload in csv_app.stream(initial_state, config=config, stream_mode=["updates", "messages"]):
+        yield from _stream_events(mode, payload)
+
+
+def _stream_events(mode: str, payload) -> Iterator[dict]:
+    """Translate one LangGraph stream item into chat events."""
+    if mode == "updates":
+        for node, update in payload.items():
+            if node in ("interpret_question", "use_question", "interpret_and_generate"):
+                if node != "use_question":
+                    yield {"type": "status", "label": "Rephrased question", "content": update["standalone_question"]}
+                if "query" in update:
+                    # Combined-call or cached code stands in for generate_query
+                    yield {"type": "code", "content": update["query"]}
+                if update["cache_hit"] == "result":
+                    yield {"type": "status", "label": "Cached result", "content": update["response"][:STATUS_RESULT_MAX_CHARS]}
+            elif node == "generate_query":
+                yield {"type": "code", "content": update["query"]}
+            elif node == "execute_query":
+                yield {"type": "status", "label": "Query result", "content": update["response"][:STATUS_RESULT_MAX_CHARS]}
+    else:
+        chunk, metadata = payload
+        # Only the last LLM call produces the user-facing answer
+        if metadata.get("langgraph_node") == "format_response" and chunk.content:
+            yield {"type": "token", "content": chunk.content}
+
+
+@traceable(client=custom_client, run_type="llm", name="CSV-Agent-async", project_name="CSV_TO_CHAT")
+async def arun_csv_chat_agent(file_path: str, user_question: str, thread_id: str, engine: Optional[str] = None) -> str:
+    """
+    Async variant of run_csv_chat_agent. LLM calls are admitted through the shared
+    scheduler, so it must run on the async engine loop (async_engine.run(...)).
+    """
+    ctx = await asyncio.to_thread(build_csv_context, file_path, engine)
+    config = {"configurable": {"thread_id": thread_id, "csv_context": ctx}}
+    initial_state = {"question": user_question, "attempts": 0}
+    final_state = await csv_app.ainvoke(initial_state, config=config)
+    return final_state["final_answer"]
+
+
+@traceable(client=custom_client, run_type="llm", name="CSV-Agent-astream", project_name="CSV_TO_CHAT")
+async def astream_csv_chat_agent(file_path: str, user_question: str, thread_id: str, engine: Optional[str] = None) -> AsyncIterator[dict]:
+    """Async variant of stream_csv_chat_agent; consume it via async_engine.iterate(...) from sync code."""
+    ctx = await asyncio.to_thread(build_csv_context, file_path, engine)
+    config = {"configurable": {"thread_id": thread_id, "csv_context": ctx}}
+    initial_state = {"question": user_question, "attempts": 0}
+    async for mode, payload in csv_app.astream(initial_state, config=config, stream_mode=["updates", "messages"]):
+        for event in _stream_events(mode, payload):
+            yield event
+
 # Example usage
 # response = run_csv_chat_agent("/path/to/export22.csv", "Give me all the columns in the dataframe", "123")
 # print(colored(response, 'red', attrs=['bold', 'underline']))
@@ -0,0 +1,142 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+from dotenv import load_dotenv
+from sidecar import load_with_sidecar
+from dtype_optimizer import MemoryReport
+
+load_dotenv()
+
+# Cached DataFrames are handed out as shallow copies. With copy-on-write
+# enabled those copies are cheap and any mutation made by generated pandas
+# code stays local to the request instead of leaking back into the cache.
+# The option is process-wide: chained assignment (df[mask]["col"] = x) is a
+# no-op for generated code too, which the code-generation prompts point out.
+pd.set_option("mode.copy_on_write", True)
+
+# Memory budget for parsed DataFrames, shared by every session in the process
+DATAFRAME_CACHE_MAX_MB = int(os.getenv("DATAFRAME_CACHE_MAX_MB", "1024"))
+
+def load_data_file(file_path: str) -> Tuple[pd.DataFrame, MemoryReport]:
+    """Load a data file (via its columnar sidecar) with compact dtypes, without touching the cache."""
+    return load_with_sidecar(file_path)
+
+
+def read_data_file(file_path: str) -> pd.DataFrame:
+    """Load a data file the way the cache does, so sandbox workers see the same dtypes."""
+    return load_data_file(file_path)[0]
+
+
+def file_version(file_path: str) -> Tuple[str, int, int]:
+    """Return the (path, mtime, size) triple that identifies one version of a file."""
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+@dataclass
+class CacheEntry:
+    key: Tuple[str, int, int]
+    df: pd.DataFrame
+    nbytes: int
+    # Derived per-version data (e.g. the dataset profile) that lives and dies with the entry
+    extras: Dict[str, Any] = field(default_factory=dict)
+
+
+class DataFrameCache:
+    """
+    Process-wide LRU cache of parsed DataFrames keyed on (path, mtime, size).
+
+    A changed file gets a new key, so the stale entry for the same path is
+    dropped on the next lookup. Entries are evicted least-recently-used first
+    once the total in-memory size exceeds ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_entry(self, file_path: str) -> CacheEntry:
+        """Return the cache entry for the current version of ``file_path``, parsing it on a miss."""
+        key = file_version(file_path)
+        path = key[0]
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.key == key:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            if entry is not None:
+                # The file changed on disk since it was cached
+                self._remove(path)
+                self.invalidations += 1
+            self.misses += 1
+
+        # Parse outside the lock so other files stay available meanwhile
+        df, report = load_data_file(path)
+        entry = CacheEntry(key=key, df=df, nbytes=report.after_bytes, extras={"memory_report": report})
+
+        with self._lock:
+            if entry.nbytes > self.max_bytes:
+                # Larger than the whole budget: serve it but don't keep it
+                return entry
+            if path in self._entries:
+                self._remove(path)
+            self._entries[path] = entry
+            self._total_bytes += entry.nbytes
+            while self._total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return entry
+
+    def get(self, file_path: str) -> pd.DataFrame:
+        """Return a private (copy-on-write) DataFrame for ``file_path``."""
+        return self.get_entry(file_path).df.copy(deep=False)
+
+    def invalidate(self, file_path: Optional[str] = None) -> None:
+        """Drop one file from the cache, or everything when no path is given."""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+                self._total_bytes = 0
+            else:
+                path = os.path.abspath(file_path)
+                if path in self._entries:
+                    self._remove(path)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and current memory usage."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, path: str) -> None:
+        entry = self._entries.pop(path)
+        self._total_bytes -= entry.nbytes
+
+
+# Shared cache instance
+dataframe_cache = DataFrameCache(max_bytes=DATAFRAME_CACHE_MAX_MB * 1024 * 1024)
+
+
+def load_dataframe(file_path: str) -> pd.DataFrame:
+    """Load a CSV/XLSX file through the shared DataFrame cache."""
+    return dataframe_cache.get(file_path)
@@ -0,0 +1,167 @@
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from data_cache import CacheEntry, dataframe_cache
+from dtype_optimizer import MemoryReport
+from prompts import estimate_tokens
+
+load_dotenv()
+
+# Prompt budgets for the rendered profile
+PROFILE_MAX_TOKENS = int(os.getenv("DATASET_PROFILE_MAX_TOKENS", "1500"))
+SAMPLE_ROWS_MAX_TOKENS = int(os.getenv("DATASET_SAMPLE_ROWS_MAX_TOKENS", "400"))
+
+# Columns with at most this many distinct values are treated as categorical
+# and get their most frequent values listed
+CATEGORICAL_MAX_UNIQUE = 50
+SAMPLE_VALUES = 5
+MAX_VALUE_CHARS = 40
+
+
+def _short(value: Any) -> str:
+    text = str(value)
+    return text if len(text) <= MAX_VALUE_CHARS else text[:MAX_VALUE_CHARS - 3] + "..."
+
+
+@dataclass
+class ColumnProfile:
+    name: str
+    dtype: str
+    nulls: int
+    unique: int
+    min: Optional[str] = None
+    max: Optional[str] = None
+    samples: List[str] = field(default_factory=list)
+
+    def render(self) -> str:
+        line = f"- {self.name} ({self.dtype}): {self.unique} unique, {self.nulls} nulls"
+        if self.min is not None:
+            line += f", min {self.min}, max {self.max}"
+        if self.samples:
+            line += f", e.g. {' | '.join(self.samples)}"
+        return line
+
+
+@dataclass
+class DatasetProfile:
+    """Compact schema summary of one version of a data file."""
+    rows: int
+    columns: List[ColumnProfile]
+    head: pd.DataFrame
+    # Set when the data is queried as a SQL table rather than loaded as a DataFrame
+    table_name: Optional[str] = None
+    # Loaded size with and without dtype optimization; None for SQL tables
+    memory: Optional[MemoryReport] = None
+    _rendered: Dict[Tuple[str, int], str] = field(default_factory=dict, repr=False)
+
+    def render(self, max_tokens: int = PROFILE_MAX_TOKENS) -> str:
+        """Render the profile for a prompt, dropping column details that don't fit ``max_tokens``."""
+        key = ("profile", max_tokens)
+        if key not in self._rendered:
+            self._rendered[key] = self._render(max_tokens)
+        return self._rendered[key]
+
+    def render_sample_rows(self, max_tokens: int = SAMPLE_ROWS_MAX_TOKENS) -> str:
+        """Render the first rows as markdown, keeping as many leading columns as fit ``max_tokens``."""
+        key = ("head", max_tokens)
+        if key not in self._rendered:
+            self._rendered[key] = self._render_sample_rows(max_tokens)
+        return self._rendered[key]
+
+    def _render(self, max_tokens: int) -> str:
+        lines = [
+            f"Table `{self.table_name}` Information:" if self.table_name else "DataFrame Information:",
+            f"- Shape: ({self.rows}, {len(self.columns)})",
+            *([self.memory.render(), *self.memory.render_conversions()] if self.memory is not None else []),
+            "Columns (name (dtype): unique values, nulls, range, examples):",
+        ]
+        budget = max_tokens - estimate_tokens("\n".join(lines))
+        shown = 0
+        for column in self.columns:
+            line = column.render()
+            cost = estimate_tokens(line)
+            if cost > budget:
+                break
+            lines.append(line)
+            budget -= cost
+            shown += 1
+
+        remaining = self.columns[shown:]
+        if remaining:
+            # Keep the names of the remaining columns if they fit so generated
+            # code can still reference them, otherwise just say how many exist
+            names = f"- {len(remaining)} more columns: {', '.join(c.name for c in remaining)}"
+            if estimate_tokens(names) <= budget:
+                lines.append(names)
+            else:
+                hint = f"DESCRIBE {self.table_name}" if self.table_name else "df.columns"
+                lines.append(f"- {len(remaining)} more columns not shown (use {hint} to list them)")
+        return "\n".join(lines)
+
+    def _render_sample_rows(self, max_tokens: int) -> str:
+        head = self.head
+        total = len(head.columns)
+        text = head.to_markdown()
+        if estimate_tokens(text) <= max_tokens:
+            return text
+
+        # Binary search for the widest prefix of columns that fits the budget
+        low, high, best = 1, total - 1, None
+        while low <= high:
+            width = (low + high) // 2
+            candidate = head.iloc[:, :width].to_markdown()
+            if estimate_tokens(candidate) <= max_tokens:
+                best, low = candidate, width + 1
+            else:
+                high = width - 1
+        if best is None:
+            return f"({total} columns, too wide to show sample rows)"
+        return best + f"\n({total - high} more columns not shown)"
+
+
+def profile_column(name: str, series: pd.Series) -> ColumnProfile:
+    non_null = series.dropna()
+    profile = ColumnProfile(
+        name=str(name),
+        dtype=str(series.dtype),
+        nulls=int(len(series) - len(non_null)),
+        unique=int(non_null.nunique()),
+    )
+    if non_null.empty:
+        return profile
+
+    is_numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+    if is_numeric or pd.api.types.is_datetime64_any_dtype(series):
+        profile.min = _short(non_null.min())
+        profile.max = _short(non_null.max())
+    elif profile.unique <= CATEGORICAL_MAX_UNIQUE:
+        top = non_null.value_counts().head(SAMPLE_VALUES)
+        profile.samples = [_short(value) for value in top.index]
+    else:
+        profile.samples = [_short(value) for value in non_null.drop_duplicates().head(3)]
+    return profile
+
+
+def profile_dataframe(df: pd.DataFrame) -> DatasetProfile:
+    """Compute dtypes, null counts, cardinality, ranges and sample values for every column."""
+    columns = [profile_column(name, df.iloc[:, i]) for i, name in enumerate(df.columns)]
+    return DatasetProfile(rows=len(df), columns=columns, head=df.head().copy())
+
+
+def profile_for_entry(entry: CacheEntry) -> DatasetProfile:
+    """Return the profile stored with a DataFrame cache entry, computing it on first use."""
+    profile = entry.extras.get("profile")
+    if profile is None:
+        profile = profile_dataframe(entry.df)
+        profile.memory = entry.extras.get("memory_report")
+        entry.extras["profile"] = profile
+    return profile
+
+
+def get_profile(file_path: str) -> DatasetProfile:
+    """Return the profile of the current version of ``file_path``."""
+    return profile_for_entry(dataframe_cache.get_entry(file_path))
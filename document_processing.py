@@ -1,61 +1,116 @@
 import time
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_pinecone import PineconeVectorStore
-from pinecone import Pinecone
 import os
 from dotenv import load_dotenv
-from langchain_cohere import CohereEmbeddings
 from llama_parse import LlamaParse
 from langchain_core.documents import Document as LangchainDocument
+from clients import client_registry, COHERE_EMBEDDINGS, VECTOR_INDEX, PINECONE_NAMESPACE
+from retrieval_cache import bump_index_version
+from bm25_index import bm25_index
+from ingestion import IngestionPipeline
+from ingest_manifest import chunk_hash, file_hash, ingest_manifest
+from parse_cache import parse_cache
+from metrics import metrics
 
 # Load environment variables
 load_dotenv()
-start_time = time.time()
 
-def document_chunking_and_uploading_to_vectorstore(filepath, actual_file_name):
+# LlamaParse options; part of the manifest settings so changing them re-ingests documents
+PARSER_SETTINGS = {
+    "result_type": "markdown",
+    "system_prompt": "Extract text from images using multimodal models and include it in the output. Parse tables and texts in images. accurately into markdown format.",
+    "language": "it",
+    "ocr": True,
+}
+
+# Text splitter options
+CHUNK_SETTINGS = {
+    "chunk_size": 512,
+    "chunk_overlap": 50,
+}
+
+# Pinecone accepts up to 1000 IDs per delete call
+DELETE_BATCH_SIZE = 1000
+
+
+def parse_document(filepath, doc_hash=None):
     """
-    Process a document, extract text from images and tables using LlamaParse,
-    and upload chunks to a Pinecone vector store with metadata.
+    Parse a document into one Langchain document per page, reusing cached LlamaParse output.
 
     Args:
         filepath (str): Path to the document file.
-        actual_file_name (str): Name of the file to include in metadata.
+        doc_hash (str, optional): Content hash of the file, if already computed.
 
     Returns:
-        str: Summary of processing statistics or None if an error occurs.
+        list: Parsed pages as LangchainDocument objects.
     """
-    try:
-        # Define namespace for vector store
-        name_space = "Test-1"  # Generate unique ID
-
-        # Initialize embeddings
-        embeddings = CohereEmbeddings(model="embed-multilingual-v3.0")
-
-        # Set up Pinecone vector store
-        pc = Pinecone(api_key=os.environ["PINECONE_API_KEY"])
-        index_name = "italian-pdf-docs"
-        index = pc.Index(index_name)
-        vector_store = PineconeVectorStore(embedding=embeddings, index=index, namespace=name_space)
-
+    doc_hash = doc_hash or file_hash(filepath)
+    pages = parse_cache.get(doc_hash, PARSER_SETTINGS)
+    if pages is None:
         # Initialize LlamaParse with advanced parsing instructions
         parser = LlamaParse(
             api_key=os.environ["LLAMA_CLOUD_API_KEY"],
-            result_type="markdown", 
-            system_prompt="Extract text from images using multimodal models and include it in the output. Parse tables and texts in images. accurately into markdown format.",
             verbose=True,
-            language="it", 
-            ocr=True, 
-
+            **PARSER_SETTINGS,
         )
 
         # Load documents using LlamaParse
         llama_documents = parser.load_data(filepath)
+        pages = [{"text": doc.text, "metadata": doc.metadata} for doc in llama_documents]
+        parse_cache.put(doc_hash, PARSER_SETTINGS, pages)
 
-        # Convert LlamaIndex documents to Langchain documents
-        documents = [
-            LangchainDocument(page_content=doc.text, metadata=doc.metadata)
-            for doc in llama_documents
-        ]
+    # Convert LlamaIndex documents to Langchain documents
+    return [
+        LangchainDocument(page_content=page["text"], metadata=dict(page["metadata"]))
+        for page in pages
+    ]
+
+
+def document_chunking_and_uploading_to_vectorstore(filepath, actual_file_name, progress=None):
+    """
+    Process a document, extract text from images and tables using LlamaParse,
+    and upload chunks to the vector store (Pinecone or local) with metadata.
+
+    Re-uploads are incremental: an unchanged file is skipped entirely, and for
+    a changed file only new chunks are embedded and upserted while vectors of
+    chunks that no longer exist are deleted.
+
+    Args:
+        filepath (str): Path to the document file.
+        actual_file_name (str): Name of the file to include in metadata.
+        progress (callable, optional): Called as progress(chunks_uploaded, total_chunks)
+            while chunks are embedded and upserted.
+
+    Returns:
+        str: Summary of processing statistics or None if an error occurs.
+    """
+    start_time = time.time()
+    try:
+        # Define namespace for vector store
+        name_space = PINECONE_NAMESPACE
+        settings = {**PARSER_SETTINGS, **CHUNK_SETTINGS}
+
+        # Skip files that were already ingested with identical content and settings
+        doc_hash = file_hash(filepath)
+        record = ingest_manifest.get(actual_file_name)
+        # Files ingested before the BM25 index existed fall through once to backfill it
+        if ingest_manifest.is_unchanged(actual_file_name, doc_hash, settings) and bm25_index.contains_all(record.chunk_ids):
+            return (
+                f"Document Processing Summary:\n"
+                f"- Filename: {actual_file_name}\n"
+                f"- Unchanged since last upload, nothing to do\n"
+                f"- Chunks: {len(record.chunk_ids)} reused, 0 added, 0 deleted\n"
+                f"- Processing Time: {round(time.time() - start_time, 3)} seconds"
+            )
+
+        # Shared embeddings and vector index clients (created once per process)
+        embeddings = client_registry.get(COHERE_EMBEDDINGS)
+        index = client_registry.get(VECTOR_INDEX)
+        pipeline = IngestionPipeline(embeddings, index, namespace=name_space)
+
+        # Parse with LlamaParse (or reuse the cached parse of this exact file)
+        with metrics.span("ingest_stage_seconds", stage="parse") as parse_span:
+            documents = parse_document(filepath, doc_hash)
 
         # Add filename to metadata and verify page numbers
         for i, doc in enumerate(documents, start=1):
@@ -64,16 +119,45 @@ def document_chunking_and_uploading_to_vectorstore(filepath, actual_file_name):
 
         # Configure text splitter to preserve metadata
         text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=512,
-            chunk_overlap=50,
-            add_start_index=True
+            add_start_index=True,
+            **CHUNK_SETTINGS,
         )
 
         # Split documents into chunks
-        all_splits = text_splitter.split_documents(documents)
+        with metrics.span("ingest_stage_seconds", stage="split") as split_span:
+            all_splits = text_splitter.split_documents(documents)
+
+        # Content-hash every chunk and work out what changed since the last upload
+        chunk_ids = [
+            chunk_hash(actual_file_name, doc.metadata["page"], doc.page_content)
+            for doc in all_splits
+        ]
+        plan = ingest_manifest.plan(actual_file_name, chunk_ids)
+        new_chunks = [all_splits[i] for i in plan.add]
+
+        # Embed and upsert only new or changed chunks in concurrent batches
+        report = None if progress is None else (lambda done: progress(done, len(new_chunks)))
+        ingestion_stats = pipeline.run(new_chunks, ids=[chunk_ids[i] for i in plan.add], progress=report)
+
+        # Remove vectors of chunks that disappeared from the document
+        with metrics.span("ingest_stage_seconds", stage="delete") as delete_span:
+            for offset in range(0, len(plan.delete), DELETE_BATCH_SIZE):
+                index.delete(ids=plan.delete[offset:offset + DELETE_BATCH_SIZE], namespace=name_space)
+
+        # Keep the BM25 index over exactly the chunks in the vector store
+        bm25_index.remove(plan.delete)
+        bm25_index.add((chunk_id, doc.page_content, doc.metadata) for chunk_id, doc in zip(chunk_ids, all_splits))
+        bm25_index.flush()
+
+        # The local index persists on flush; Pinecone writes are durable already
+        if hasattr(index, "flush"):
+            index.flush()
+
+        ingest_manifest.record(actual_file_name, doc_hash, settings, len(documents), chunk_ids)
 
-        # Add chunks to vector store
-        vector_store.add_documents(documents=all_splits)
+        # Cached retrieval results predate these changes
+        if plan.add or plan.delete:
+            bump_index_version()
 
         # Calculate processing time
         processing_time = round(time.time() - start_time, 3)
@@ -84,6 +168,11 @@ def document_chunking_and_uploading_to_vectorstore(filepath, actual_file_name):
             f"- Filename: {actual_file_name}\n"
             f"- Pages Processed: {len(documents)}\n"
             f"- Chunks Created: {len(all_splits)}\n"
+            f"- Chunks: {len(plan.reused)} reused, {len(plan.add)} added, {len(plan.delete)} deleted\n"
+            f"- Upload: {ingestion_stats.summary()}\n"
+            f"- Stage Times: parse {parse_span.elapsed:.2f}s, split {split_span.elapsed:.2f}s, "
+            f"embed {ingestion_stats.embed_seconds:.2f}s, upsert {ingestion_stats.upsert_seconds:.2f}s, "
+            f"delete {delete_span.elapsed:.2f}s\n"
             f"- Processing Time: {processing_time} seconds"
         )
         return info
@@ -0,0 +1,171 @@
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Shrink DataFrames at load time (set DTYPE_OPTIMIZE=0 to keep pandas' default dtypes)
+DTYPE_OPTIMIZE = os.getenv("DTYPE_OPTIMIZE", "1") != "0"
+# Categoricals change how generated code behaves (value_counts lists unused
+# categories, string concatenation and assigning new values raise), so they are opt-in
+DTYPE_CATEGORIES = os.getenv("DTYPE_CATEGORIES", "0") == "1"
+# Text columns whose distinct values are at most this share of their non-null values become categoricals
+DTYPE_CATEGORY_MAX_RATIO = float(os.getenv("DTYPE_CATEGORY_MAX_RATIO", "0.5"))
+# Store the remaining text columns as Arrow-backed strings instead of Python objects.
+# They keep NaN for missing values and the usual .str, comparison and concatenation
+# behaviour (pandas 3's default "str" dtype), and map zero-copy from the sidecar.
+DTYPE_ARROW_STRINGS = os.getenv("DTYPE_ARROW_STRINGS", "1") != "0"
+# float64 -> float32 loses precision in sums of money amounts, so it is opt-in
+DTYPE_DOWNCAST_FLOATS = os.getenv("DTYPE_DOWNCAST_FLOATS", "0") == "1"
+
+# Small files gain nothing from categoricals, and not converting them keeps behaviour identical
+CATEGORY_MIN_ROWS = 1000
+# Non-null values checked against the date patterns before parsing a whole column
+DATE_SAMPLE_SIZE = 200
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$")
+_DAY_FIRST_DATE = re.compile(r"^\d{1,2}[/.-]\d{1,2}[/.-]\d{4}( \d{2}:\d{2}(:\d{2})?)?$")
+
+# Prompt hints for generated code, by the dtype a column was converted to
+_CONVERSION_HINTS = {
+    "datetime64": "parsed from date text; use .dt and compare with pd.Timestamp, .str does not work",
+    "category": "repeated text stored as categories; value_counts lists unused categories",
+    "str": "text stored as Arrow strings; .str works as usual",
+    "float32": "floats stored in 32 bits",
+}
+
+
+@dataclass
+class MemoryReport:
+    """Memory footprint of a DataFrame before and after dtype optimization."""
+    before_bytes: int
+    after_bytes: int
+    conversions: Dict[str, str] = field(default_factory=dict)  # column -> "old -> new" dtype
+
+    def render(self) -> str:
+        line = f"- Memory: {self.after_bytes / 1024 / 1024:.1f} MB"
+        if self.conversions:
+            line += (
+                f" ({self.before_bytes / 1024 / 1024:.1f} MB with default dtypes; "
+                f"{len(self.conversions)} columns converted to compact dtypes)"
+            )
+        return line
+
+    def render_conversions(self) -> List[str]:
+        """One prompt line per kind of conversion, naming the converted columns."""
+        groups: Dict[str, List[str]] = {}
+        for column, change in self.conversions.items():
+            dtype = change.split(" -> ")[-1]
+            kind = next((prefix for prefix in _CONVERSION_HINTS if dtype.startswith(prefix)), dtype)
+            groups.setdefault(kind, []).append(column)
+        return [
+            f"- Converted at load ({_CONVERSION_HINTS.get(kind, kind)}): {', '.join(columns)}"
+            for kind, columns in groups.items()
+        ]
+
+
+def _arrow_string_dtype() -> Optional[pd.StringDtype]:
+    """Arrow-backed strings with NaN for missing values; None before pandas 2.1 or without pyarrow."""
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)  # pandas >= 2.3
+    except TypeError:
+        pass
+    except ImportError:
+        return None
+    try:
+        return pd.StringDtype("pyarrow_numpy")  # pandas 2.1 and 2.2
+    except (ValueError, ImportError):
+        return None
+
+
+_ARROW_STRING = _arrow_string_dtype()
+
+
+def _memory(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _parse_dates(series: pd.Series, non_null: pd.Series):
+    sample = non_null.iloc[:DATE_SAMPLE_SIZE]
+    if not all(isinstance(value, str) for value in sample):
+        return None
+    if all(_ISO_DATE.match(value) for value in sample):
+        parsed = pd.to_datetime(series, errors="coerce", format="ISO8601")
+    elif all(_DAY_FIRST_DATE.match(value) for value in sample):
+        # Italian exports write dates as dd/mm/yyyy
+        parsed = pd.to_datetime(series, errors="coerce", dayfirst=True)
+    else:
+        return None
+    # Only keep the conversion if every value parsed
+    return parsed if parsed.notna().sum() == len(non_null) else None
+
+
+def _optimize_column(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_object_dtype(series) or isinstance(series.dtype, pd.StringDtype):
+        non_null = series.dropna()
+        if non_null.empty:
+            return series
+        parsed = _parse_dates(series, non_null)
+        if parsed is not None:
+            return parsed
+        if not all(isinstance(value, str) for value in non_null.iloc[:DATE_SAMPLE_SIZE]):
+            return series
+        if DTYPE_CATEGORIES and len(non_null) >= CATEGORY_MIN_ROWS and non_null.nunique() <= DTYPE_CATEGORY_MAX_RATIO * len(non_null):
+            return series.astype("category")
+        if (
+            DTYPE_ARROW_STRINGS and _ARROW_STRING is not None and pd.api.types.is_object_dtype(series)
+            # Every value must already be text, so no number is silently turned into a string
+            and pd.api.types.infer_dtype(non_null, skipna=False) == "string"
+        ):
+            return series.astype(_ARROW_STRING)
+        return series
+
+    # Integers stay int64: products and sums in generated code overflow narrower types silently
+    if DTYPE_DOWNCAST_FLOATS and series.dtype == np.float64:
+        narrowed = series.astype(np.float32)
+        # Lossless only: every value must survive the round trip
+        if ((narrowed.astype(np.float64) == series) | series.isna()).all():
+            return narrowed
+    return series
+
+
+def optimize_dtypes(df: pd.DataFrame) -> Tuple[pd.DataFrame, MemoryReport]:
+    """
+    Convert columns to compact dtypes without changing their values.
+
+    Date text is parsed once into datetime64 and other text becomes Arrow
+    strings. Optionally, repeated text (product names, carrier codes)
+    becomes categorical and floats are narrowed where that is lossless.
+    Data files are converted once, when their sidecar is written, so later
+    loads map the converted columns instead of copying them again.
+
+    Returns:
+        Tuple[pd.DataFrame, MemoryReport]: The optimized frame and its memory before/after.
+    """
+    before = _memory(df)
+    if not DTYPE_OPTIMIZE:
+        return df, MemoryReport(before_bytes=before, after_bytes=before)
+
+    optimized = df.copy(deep=False)
+    conversions = {}
+    for position, name in enumerate(df.columns):
+        series = df.iloc[:, position]
+        converted = _optimize_column(series)
+        if converted is not series:
+            optimized.isetitem(position, converted)
+            conversions[str(name)] = f"{series.dtype} -> {converted.dtype}"
+    if not conversions:
+        return df, MemoryReport(before_bytes=before, after_bytes=before)
+    return optimized, MemoryReport(before_bytes=before, after_bytes=_memory(optimized), conversions=conversions)
+
+
+def dtype_settings() -> str:
+    """The settings that decide a converted frame's dtypes; sidecars written under others are rebuilt."""
+    return (
+        f"optimize={DTYPE_OPTIMIZE:d},categories={DTYPE_CATEGORIES:d},"
+        f"arrow_strings={DTYPE_ARROW_STRINGS:d},floats={DTYPE_DOWNCAST_FLOATS:d}"
+    )
@@ -0,0 +1,227 @@
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import pyarrow as pa
+from dotenv import load_dotenv
+from termcolor import colored
+
+from data_cache import file_version
+from dataset_profile import ColumnProfile, DatasetProfile, _short
+from sandbox import SANDBOX_TIMEOUT_S, QueryResult, query_error, truncate_result
+from sidecar import ensure_sidecar, read_source_file, sidecar_path
+
+load_dotenv()
+
+# "pandas", "duckdb", or "auto": DuckDB for files of at least DUCKDB_THRESHOLD_MB
+CSV_ENGINE = os.getenv("CSV_ENGINE", "auto")
+DUCKDB_THRESHOLD_MB = float(os.getenv("DUCKDB_THRESHOLD_MB", "500"))
+# DuckDB spills to DUCKDB_TEMP_DIR instead of going past this
+DUCKDB_MEMORY_LIMIT = os.getenv("DUCKDB_MEMORY_LIMIT", "2GB")
+DUCKDB_THREADS = int(os.getenv("DUCKDB_THREADS", str(os.cpu_count() or 4)))
+DUCKDB_TEMP_DIR = os.path.abspath(os.getenv("DUCKDB_TEMP_DIR", ".duckdb_tmp"))
+# Rows of a query result passed on to the format_response prompt
+DUCKDB_MAX_RESULT_ROWS = int(os.getenv("DUCKDB_MAX_RESULT_ROWS", "200"))
+
+# Generated SQL queries the file through a view of this name, like the pandas path's `df`
+TABLE_NAME = "df"
+_PROFILE_CACHE_SIZE = 16
+
+
+class DuckDBAccessError(RuntimeError):
+    """A DuckDB connection's file access could not be restricted to the queried file."""
+
+
+def choose_engine(file_path: str, engine: Optional[str] = None) -> str:
+    """
+    Resolve the execution engine for a file: an explicit choice wins, "auto" goes by file size.
+
+    Without a DuckDB that can confine queries to one file, everything runs on pandas.
+    """
+    engine = (engine or CSV_ENGINE).lower()
+    if engine not in ("pandas", "duckdb"):
+        engine = "duckdb" if os.path.getsize(file_path) >= DUCKDB_THRESHOLD_MB * 1024 * 1024 else "pandas"
+    if engine == "duckdb" and not duckdb_supported():
+        return "pandas"
+    return engine
+
+
+@functools.lru_cache(maxsize=1)
+def duckdb_supported() -> bool:
+    """True if DuckDB is installed and can restrict file access (allowed_paths needs DuckDB >= 1.2)."""
+    try:
+        import duckdb
+    except ImportError:
+        print(colored("DuckDB is not installed; data files are queried with pandas", "yellow"))
+        return False
+    con = duckdb.connect()
+    try:
+        _restrict(con, [])
+        return True
+    except duckdb.Error as e:
+        print(colored(f"DuckDB file access cannot be restricted (needs DuckDB >= 1.2), using pandas instead: {e}", "yellow"))
+        return False
+    finally:
+        con.close()
+
+
+def _literal(text: str) -> str:
+    return "'" + text.replace("'", "''") + "'"
+
+
+def _connect(file_path: str):
+    """
+    Fresh in-memory DuckDB connection with the file exposed as view ``df``.
+
+    CSV and Parquet are scanned in place, so only the columns and row groups
+    a query needs are read; XLSX goes through its memory-mapped Arrow sidecar.
+    File access is then restricted to that file and the configuration locked,
+    so generated SQL cannot read or write anything else.
+    """
+    import duckdb
+
+    path = os.path.abspath(file_path)
+    os.makedirs(DUCKDB_TEMP_DIR, exist_ok=True)
+    con = duckdb.connect(config={
+        "threads": DUCKDB_THREADS,
+        "memory_limit": DUCKDB_MEMORY_LIMIT,
+        "temp_directory": DUCKDB_TEMP_DIR,
+    })
+    allowed = [path]
+    if path.endswith(".xlsx"):
+        if ensure_sidecar(path):
+            source = pa.ipc.open_file(pa.memory_map(sidecar_path(path))).read_all()
+        else:
+            # No sidecar could be written; register the parsed workbook instead
+            source = read_source_file(path)
+        con.register("_source", source)
+        con.execute(f"CREATE VIEW {TABLE_NAME} AS SELECT * FROM _source")
+    elif path.endswith(".parquet"):
+        con.execute(f"CREATE VIEW {TABLE_NAME} AS SELECT * FROM read_parquet({_literal(path)})")
+    else:
+        con.execute(f"CREATE VIEW {TABLE_NAME} AS SELECT * FROM read_csv({_literal(path)})")
+
+    try:
+        _restrict(con, allowed)
+    except duckdb.Error as e:
+        # Fail closed: generated SQL must never run on a connection that can read other files
+        con.close()
+        raise DuckDBAccessError(f"DuckDB file access could not be restricted (needs DuckDB >= 1.2): {e}") from e
+    return con
+
+
+def _restrict(con, allowed) -> None:
+    con.execute(f"SET allowed_paths = [{', '.join(_literal(p) for p in allowed)}]")
+    con.execute(f"SET allowed_directories = [{_literal(DUCKDB_TEMP_DIR)}]")
+    con.execute("SET enable_external_access = false")
+    con.execute("SET lock_configuration = true")
+
+
+def _strip_fences(sql: str) -> str:
+    sql = sql.strip()
+    if sql.startswith("```"):
+        sql = sql.split("\n", 1)[1] if "\n" in sql else ""
+        sql = sql.rsplit("```", 1)[0]
+    return sql.strip().rstrip(";")
+
+
+def run_sql(file_path: str, sql: str, cancel: Optional[threading.Event] = None, timeout: float = SANDBOX_TIMEOUT_S) -> QueryResult:
+    """
+    Run generated SQL against ``file_path``.
+
+    At most DUCKDB_MAX_RESULT_ROWS rows are fetched, as Arrow record batches.
+    The query is interrupted on ``timeout`` or when ``cancel`` is set.
+
+    Returns:
+        QueryResult: The rendered result, or ok=False and an "Error executing query: ..." message.
+    """
+    import duckdb
+
+    try:
+        con = _connect(file_path)
+    except (duckdb.Error, DuckDBAccessError, OSError) as e:
+        return query_error(str(e))
+
+    done = threading.Event()
+    reason = []
+
+    def watchdog():
+        deadline = time.monotonic() + timeout
+        while not done.wait(0.05):
+            if cancel is not None and cancel.is_set():
+                reason.append("cancelled")
+            elif time.monotonic() > deadline:
+                reason.append(f"timed out after {timeout:.0f} seconds")
+            else:
+                continue
+            con.interrupt()
+            return
+
+    threading.Thread(target=watchdog, name="duckdb-watchdog", daemon=True).start()
+    try:
+        reader = con.execute(_strip_fences(sql)).fetch_record_batch(DUCKDB_MAX_RESULT_ROWS + 1)
+        batches, rows = [], 0
+        for batch in reader:
+            batches.append(batch)
+            rows += batch.num_rows
+            if rows > DUCKDB_MAX_RESULT_ROWS:
+                break
+        table = pa.Table.from_batches(batches, schema=reader.schema)
+    except duckdb.Error as e:
+        return query_error(reason[0] if reason else str(e))
+    finally:
+        done.set()
+        con.close()
+    return QueryResult(True, truncate_result(_render(table)))
+
+
+def _render(table: pa.Table) -> str:
+    if table.num_rows == 1 and table.num_columns == 1:
+        return str(table.column(0)[0].as_py())
+    shown = table.slice(0, DUCKDB_MAX_RESULT_ROWS)
+    text = shown.to_pandas().to_string(index=False)
+    if table.num_rows > DUCKDB_MAX_RESULT_ROWS:
+        text += f"\n... (only the first {DUCKDB_MAX_RESULT_ROWS} rows are shown)"
+    return text
+
+
+_profiles: "OrderedDict[tuple, DatasetProfile]" = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def profile_file(file_path: str) -> DatasetProfile:
+    """Schema, row count and per-column summary from one DuckDB SUMMARIZE pass, cached per file version."""
+    version = file_version(file_path)
+    with _profiles_lock:
+        if version in _profiles:
+            _profiles.move_to_end(version)
+            return _profiles[version]
+
+    con = _connect(file_path)
+    try:
+        summary = con.execute(f"SUMMARIZE {TABLE_NAME}").fetch_arrow_table().to_pylist()
+        head = con.execute(f"SELECT * FROM {TABLE_NAME} LIMIT 5").fetchdf()
+    finally:
+        con.close()
+
+    rows = int(summary[0]["count"]) if summary else 0
+    columns = [
+        ColumnProfile(
+            name=column["column_name"],
+            dtype=column["column_type"],
+            nulls=round(float(column["null_percentage"] or 0) * rows / 100),
+            unique=int(column["approx_unique"] or 0),
+            min=_short(column["min"]) if column["min"] is not None else None,
+            max=_short(column["max"]) if column["max"] is not None else None,
+        )
+        for column in summary
+    ]
+    profile = DatasetProfile(rows=rows, columns=columns, head=head, table_name=TABLE_NAME)
+    with _profiles_lock:
+        _profiles[version] = profile
+        while len(_profiles) > _PROFILE_CACHE_SIZE:
+            _profiles.popitem(last=False)
+    return profile
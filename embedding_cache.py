@@ -0,0 +1,124 @@
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from clients import client_registry, COHERE_EMBEDDINGS, EMBEDDING_MODEL
+from text_utils import normalize_query
+
+load_dotenv()
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "2000"))
+EMBEDDING_CACHE_TTL = float(os.getenv("EMBEDDING_CACHE_TTL", str(7 * 24 * 3600)))
+# Optional SQLite file for a persistent tier shared across restarts; empty disables it
+EMBEDDING_CACHE_DB = os.getenv("EMBEDDING_CACHE_DB", "")
+
+
+class EmbeddingCache:
+    """
+    Query-embedding cache: an in-memory LRU in front of an optional SQLite tier.
+
+    Keys are (model, normalized text). Entries older than ``ttl`` seconds are
+    treated as misses in both tiers.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, db_path: str = ""):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT, query TEXT, created REAL, vector BLOB, PRIMARY KEY (model, query))"
+            )
+            self._db.commit()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, text: str, model: str) -> Optional[List[float]]:
+        key = (model, normalize_query(text))
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                created, vector = item
+                if now - created <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return vector
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT created, vector FROM embeddings WHERE model = ? AND query = ?", key
+                ).fetchone()
+                if row is not None and now - row[0] <= self.ttl:
+                    vector = array("d", row[1]).tolist()
+                    self._remember(key, row[0], vector)
+                    self.disk_hits += 1
+                    return vector
+                if row is not None:
+                    self._db.execute("DELETE FROM embeddings WHERE model = ? AND query = ?", key)
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, model: str, vector: List[float]) -> None:
+        key = (model, normalize_query(text))
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, list(vector))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)",
+                    (*key, created, array("d", vector).tobytes()),
+                )
+                self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM embeddings")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "entries": len(self._memory),
+            }
+
+    def _remember(self, key: Tuple[str, str], created: float, vector: List[float]) -> None:
+        self._memory[key] = (created, vector)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+# Shared cache instance
+embedding_cache = EmbeddingCache(EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_TTL, EMBEDDING_CACHE_DB)
+
+
+def embed_query(query: str) -> List[float]:
+    """Embed a search query, skipping the Cohere call entirely on a cache hit."""
+    vector = embedding_cache.get(query, EMBEDDING_MODEL)
+    if vector is None:
+        with client_registry.use(COHERE_EMBEDDINGS) as embeddings:
+            vector = embeddings.embed_query(query)
+        embedding_cache.put(query, EMBEDDING_MODEL, vector)
+    return vector
@@ -0,0 +1,257 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from termcolor import colored
+
+from text_utils import normalize_query
+
+load_dotenv()
+
+FEEDBACK_DB = os.getenv("FEEDBACK_DB", "feedback/feedback.sqlite")
+# Clicks are queued and written in one transaction per batch, at most this often
+FEEDBACK_FLUSH_INTERVAL_S = float(os.getenv("FEEDBACK_FLUSH_INTERVAL_S", "0.5"))
+FEEDBACK_BATCH_SIZE = int(os.getenv("FEEDBACK_BATCH_SIZE", "256"))
+# Where the old per-type JSON arrays (liked.json, disliked.json) live
+LEGACY_FEEDBACK_DIR = os.getenv("LEGACY_FEEDBACK_DIR", "feedback")
+
+FEEDBACK_TYPES = ("liked", "disliked")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    feedback_type TEXT NOT NULL,
+    question TEXT NOT NULL,
+    question_key TEXT NOT NULL,
+    response TEXT NOT NULL,
+    thread_id TEXT,
+    mode TEXT
+);
+CREATE INDEX IF NOT EXISTS feedback_created ON feedback (created);
+CREATE INDEX IF NOT EXISTS feedback_type_created ON feedback (feedback_type, created);
+CREATE INDEX IF NOT EXISTS feedback_question ON feedback (question_key, created);
+CREATE TABLE IF NOT EXISTS migrations (name TEXT PRIMARY KEY, applied REAL NOT NULL);
+"""
+
+_INSERT = (
+    "INSERT INTO feedback (created, feedback_type, question, question_key, response, thread_id, mode) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+@dataclass
+class FeedbackRecord:
+    created: float
+    feedback_type: str
+    question: str
+    response: str
+    thread_id: Optional[str] = None
+    mode: Optional[str] = None
+
+    @property
+    def timestamp(self) -> str:
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.created))
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    # SQLite's own file locks serialize writers across processes; WAL lets readers run alongside them
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class FeedbackStore:
+    """
+    Append-only thumbs-up/down store in SQLite (WAL mode).
+
+    ``record`` only enqueues; a background thread writes queued clicks in
+    one transaction per batch, so a click never rewrites earlier feedback
+    and concurrent sessions (or processes) cannot overwrite each other.
+    Queries by time range, type and question use indexes.
+    """
+
+    def __init__(self, path: str, flush_interval: float = FEEDBACK_FLUSH_INTERVAL_S, batch_size: int = FEEDBACK_BATCH_SIZE, legacy_dir: Optional[str] = LEGACY_FEEDBACK_DIR):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.legacy_dir = legacy_dir
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._reader: Optional[sqlite3.Connection] = None
+        self._writer: Optional[threading.Thread] = None
+        self.written = 0
+        self.batches = 0
+        atexit.register(self.flush, 5)
+
+    def _open(self) -> sqlite3.Connection:
+        """Connection for the calling side, creating the schema and migrating legacy files on first use."""
+        if self._reader is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = _connect(self.path)
+            conn.executescript(_SCHEMA)
+            if self.legacy_dir:
+                self._migrate_legacy(conn)
+            self._reader = conn
+        return self._reader
+
+    def _migrate_legacy(self, conn: sqlite3.Connection) -> None:
+        """Import liked.json / disliked.json once; the migrations table makes this run once across processes."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM migrations WHERE name = 'legacy_json'").fetchone():
+                conn.rollback()
+                return
+            imported = 0
+            for feedback_type in FEEDBACK_TYPES:
+                legacy_path = os.path.join(self.legacy_dir, f"{feedback_type}.json")
+                if not os.path.exists(legacy_path):
+                    continue
+                try:
+                    with open(legacy_path, "r") as f:
+                        items = json.load(f)
+                except json.JSONDecodeError:
+                    print(colored(f"Skipping unreadable legacy feedback file {legacy_path}", "yellow"))
+                    continue
+                rows = [
+                    self._row(FeedbackRecord(
+                        created=_parse_timestamp(item.get("timestamp", "")),
+                        feedback_type=feedback_type,
+                        question=item.get("user_input", ""),
+                        response=item.get("assistant_response", ""),
+                    ))
+                    for item in items
+                ]
+                conn.executemany(_INSERT, rows)
+                imported += len(rows)
+            conn.execute("INSERT INTO migrations VALUES ('legacy_json', ?)", (time.time(),))
+            conn.commit()
+            if imported:
+                print(colored(f"Migrated {imported} legacy feedback records into {self.path}", "green"))
+        except BaseException:
+            conn.rollback()
+            raise
+
+    @staticmethod
+    def _row(record: FeedbackRecord) -> tuple:
+        return (
+            record.created, record.feedback_type, record.question, normalize_query(record.question),
+            record.response, record.thread_id, record.mode,
+        )
+
+    def record(self, question: str, response: str, feedback_type: str, thread_id: Optional[str] = None, mode: Optional[str] = None) -> None:
+        """Queue one click; it is written within ``flush_interval`` seconds."""
+        if feedback_type not in FEEDBACK_TYPES:
+            raise ValueError(f"feedback_type must be one of {FEEDBACK_TYPES}, not {feedback_type!r}")
+        self._ensure_writer()
+        self._queue.put(FeedbackRecord(time.time(), feedback_type, question, response, thread_id, mode))
+
+    def _ensure_writer(self) -> None:
+        with self._lock:
+            self._open()
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="feedback-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self) -> None:
+        conn = _connect(self.path)
+        while True:
+            item = self._queue.get()
+            batch, waiters = [], []
+            deadline = time.monotonic() + self.flush_interval
+            # Gather whatever arrives within the flush interval into one transaction
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break  # flush requested: write now
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    with conn:
+                        conn.executemany(_INSERT, [self._row(record) for record in batch])
+                    with self._lock:
+                        self.written += len(batch)
+                        self.batches += 1
+                except sqlite3.Error as e:
+                    print(colored(f"Could not write {len(batch)} feedback records: {e}", "red"))
+            for waiter in waiters:
+                waiter.set()
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until every click queued so far is written."""
+        if self._writer is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def query(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        feedback_type: Optional[str] = None,
+        question: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[FeedbackRecord]:
+        """Newest-first feedback, optionally filtered by time range (epoch seconds), type and question."""
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("created >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created < ?")
+            params.append(until)
+        if feedback_type is not None:
+            clauses.append("feedback_type = ?")
+            params.append(feedback_type)
+        if question is not None:
+            # Same normalization as at write time, so spacing and case don't matter
+            clauses.append("question_key = ?")
+            params.append(normalize_query(question))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._open().execute(
+                f"SELECT created, feedback_type, question, response, thread_id, mode FROM feedback {where} "
+                "ORDER BY created DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [FeedbackRecord(*row) for row in rows]
+
+    def counts(self, since: Optional[float] = None) -> Dict[str, int]:
+        """Number of liked / disliked answers, optionally since a point in time."""
+        with self._lock:
+            rows = self._open().execute(
+                "SELECT feedback_type, COUNT(*) FROM feedback WHERE created >= ? GROUP BY feedback_type",
+                (since or 0,),
+            ).fetchall()
+        return {feedback_type: 0 for feedback_type in FEEDBACK_TYPES} | dict(rows)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"written": self.written, "batches": self.batches, "pending": self._queue.qsize()}
+
+
+def _parse_timestamp(text: str) -> float:
+    """Epoch seconds of a legacy "YYYY-MM-DD HH:MM:SS" local timestamp; 0 if missing or malformed."""
+    try:
+        return time.mktime(time.strptime(text, "%Y-%m-%d %H:%M:%S"))
+    except ValueError:
+        return 0.0
+
+
+# Shared store instance
+feedback_store = FeedbackStore(FEEDBACK_DB)
@@ -0,0 +1,231 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from termcolor import colored
+
+from ingest_manifest import ingest_manifest
+from metrics import metrics
+
+load_dotenv()
+
+# Folder holding the data files offered in CSV mode
+CSV_DOCUMENTS_DIR = os.getenv("CSV_DOCUMENTS_DIR", "all_csv_documents")
+DATA_FILE_EXTENSIONS = (".csv", ".xlsx", ".parquet")
+# Rescan interval; with watchdog installed, changes also trigger a rescan right away
+CATALOG_POLL_S = float(os.getenv("CATALOG_POLL_S", "2"))
+# Parse, profile and cache new or changed data files in the background (0 waits for the first question)
+CATALOG_PREWARM = os.getenv("CATALOG_PREWARM", "1") != "0"
+CATALOG_PREWARM_WORKERS = int(os.getenv("CATALOG_PREWARM_WORKERS", "1"))
+
+
+@dataclass
+class DataFileInfo:
+    name: str
+    path: str
+    size: int
+    mtime_ns: int
+    status: str = "pending"  # pending -> warming -> ready | error
+    engine: Optional[str] = None
+    rows: Optional[int] = None
+    columns: List[Tuple[str, str]] = field(default_factory=list)  # (name, dtype)
+    error: Optional[str] = None
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        return self.mtime_ns, self.size
+
+
+@dataclass
+class PdfDocumentInfo:
+    name: str
+    pages: int
+    chunks: int
+    status: str = "ingested"
+
+
+class FileCatalog:
+    """
+    Catalog of the data files in ``directory`` and of the ingested PDFs.
+
+    A background thread rescans the folder every ``poll_interval`` seconds
+    (a stat per file, no reads), and right away on filesystem events when
+    the watchdog package is installed. Once ``start_warming`` is called
+    (when CSV mode is first used, so PDF-only sessions never load the CSV
+    stack), new or changed data files are pre-warmed on a small thread pool:
+    parsed into the DataFrame cache (or profiled by DuckDB) so the first
+    question against them is served warm. PDF entries come from the ingest
+    manifest, i.e. what is actually in the index.
+    """
+
+    def __init__(self, directory: str, poll_interval: float = CATALOG_POLL_S, prewarm: bool = CATALOG_PREWARM, workers: int = CATALOG_PREWARM_WORKERS):
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.prewarm = prewarm
+        self._files: Dict[str, DataFileInfo] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._warmer = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="catalog-warm")
+        self._thread: Optional[threading.Thread] = None
+        self._scanned = False
+        self._warming = False
+
+    def start(self) -> "FileCatalog":
+        """Scan once, then keep watching in the background. Safe to call repeatedly."""
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._thread = threading.Thread(target=self._watch, name="file-catalog", daemon=True)
+        self.refresh()
+        self._start_observer()
+        self._thread.start()
+        return self
+
+    def start_warming(self) -> None:
+        """Pre-warm the files seen so far and, from now on, every new or changed one. Safe to call repeatedly."""
+        with self._lock:
+            if self._warming:
+                return
+            self._warming = True
+            pending = [info for info in self._files.values() if info.status == "pending"]
+        for info in pending:
+            self._submit(info)
+
+    def _submit(self, info: DataFileInfo) -> None:
+        self._warmer.submit(self._warm if self.prewarm else self._convert, info)
+
+    def _start_observer(self) -> None:
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return
+        wake = self._wake
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                wake.set()
+
+        if os.path.isdir(self.directory):
+            observer = Observer()
+            observer.schedule(_Handler(), self.directory, recursive=False)
+            observer.daemon = True
+            observer.start()
+
+    def _watch(self) -> None:
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                self.refresh()
+            except OSError as e:
+                print(colored(f"File catalog scan failed: {e}", "yellow"))
+
+    def refresh(self) -> bool:
+        """Rescan the folder; returns True if any file was added, changed or removed."""
+        found = {}
+        if os.path.isdir(self.directory):
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(DATA_FILE_EXTENSIONS):
+                        stat = entry.stat()
+                        found[os.path.abspath(entry.path)] = (entry.name, stat.st_mtime_ns, stat.st_size)
+
+        changed, removed = [], []
+        with self._lock:
+            self._scanned = True
+            warming = self._warming
+            for path, (name, mtime_ns, size) in found.items():
+                info = self._files.get(path)
+                if info is None or info.version != (mtime_ns, size):
+                    info = DataFileInfo(name=name, path=path, size=size, mtime_ns=mtime_ns)
+                    self._files[path] = info
+                    changed.append(info)
+            for path in set(self._files) - set(found):
+                del self._files[path]
+                removed.append(path)
+
+        if not warming:
+            # Nothing is loaded yet; changed files stay "pending" until start_warming
+            return bool(changed or removed)
+        for info in changed:
+            self._submit(info)
+        if removed:
+            from data_cache import dataframe_cache
+            for path in removed:
+                dataframe_cache.invalidate(path)
+        return bool(changed or removed)
+
+    def _warm(self, info: DataFileInfo) -> None:
+        """Load and profile one file version through the same caches the CSV agent reads from."""
+        from duckdb_engine import choose_engine
+
+        with self._lock:
+            if self._files.get(info.path) is not info:
+                return  # superseded by a newer version or removed
+            info.status = "warming"
+        try:
+            with metrics.span("catalog_prewarm_seconds"):
+                engine = choose_engine(info.path)
+                if engine == "duckdb":
+                    from duckdb_engine import profile_file
+                    profile = profile_file(info.path)
+                else:
+                    from answer_cache import file_content_hash
+                    from data_cache import dataframe_cache
+                    from dataset_profile import profile_for_entry
+                    entry = dataframe_cache.get_entry(info.path)
+                    profile = profile_for_entry(entry)
+                    file_content_hash(entry)
+        except Exception as e:
+            print(colored(f"Could not pre-warm {info.name}: {e}", "yellow"))
+            metrics.inc("catalog_prewarm", result="error")
+            with self._lock:
+                info.status, info.error = "error", str(e)
+            return
+        metrics.inc("catalog_prewarm", result="ok")
+        with self._lock:
+            info.engine = engine
+            info.rows = profile.rows
+            info.columns = [(column.name, column.dtype) for column in profile.columns]
+            info.status = "ready"
+
+    def _convert(self, info: DataFileInfo) -> None:
+        """Without pre-warming, still build the columnar sidecar of files pandas will load."""
+        from duckdb_engine import choose_engine
+        from sidecar import ensure_sidecar
+
+        if choose_engine(info.path) == "pandas":
+            ensure_sidecar(info.path)
+
+    def data_files(self) -> List[DataFileInfo]:
+        """Data files currently in the folder, by name."""
+        if not self._scanned:
+            self.refresh()
+        with self._lock:
+            return sorted(self._files.values(), key=lambda info: info.name)
+
+    def get(self, path: str) -> Optional[DataFileInfo]:
+        with self._lock:
+            return self._files.get(os.path.abspath(path))
+
+    def pdf_documents(self) -> List[PdfDocumentInfo]:
+        """Documents recorded in the ingest manifest, by name."""
+        return [
+            PdfDocumentInfo(name=name, pages=record.pages, chunks=len(record.chunk_ids))
+            for name, record in sorted(ingest_manifest.documents().items())
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {"files": len(self._files)}
+            for info in self._files.values():
+                counts[info.status] = counts.get(info.status, 0) + 1
+        return counts
+
+
+# Shared catalog instance
+file_catalog = FileCatalog(CSV_DOCUMENTS_DIR)
@@ -0,0 +1,54 @@
+import os
+from typing import Dict, Hashable, List, Sequence, Tuple, TypeVar
+
+from dotenv import load_dotenv
+
+from clients import client_registry, RERANKER
+
+load_dotenv()
+
+T = TypeVar("T")
+
+# Fuse BM25 with dense results in the retrieve tool (set HYBRID_RETRIEVAL=0 for dense only)
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "1") != "0"
+# Chunks handed to the agent per retrieve call
+RETRIEVE_TOP_K = int(os.getenv("RETRIEVE_TOP_K", "10"))
+# Candidates each retriever contributes before fusion
+RETRIEVE_CANDIDATES = int(os.getenv("RETRIEVE_CANDIDATES", "20"))
+# Dense matches below this cosine similarity are dropped
+RETRIEVE_MIN_SCORE = float(os.getenv("RETRIEVE_MIN_SCORE", "0"))
+# Chunks starting this close to a better one on the same page are dropped (0 disables);
+# the default is the ingestion chunk size, i.e. direct neighbours
+RETRIEVE_DEDUP_GAP = int(os.getenv("RETRIEVE_DEDUP_GAP", "512"))
+# Rank damping constant from the original RRF paper
+RRF_K = int(os.getenv("RRF_K", "60"))
+# Re-score the fused candidates with a local cross-encoder (needs sentence-transformers)
+RETRIEVE_RERANK = os.getenv("RETRIEVE_RERANK", "0") == "1"
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Tuple[Hashable, T]]], k: int = RRF_K) -> List[Tuple[T, float]]:
+    """
+    Merge ranked lists of (key, item) pairs by reciprocal rank fusion.
+
+    Each item scores sum(1 / (k + rank)) over the lists it appears in, so
+    agreement between retrievers outweighs a single high rank. For keys seen
+    in several lists the item from the earliest list is kept.
+
+    Returns:
+        List[Tuple[T, float]]: (item, fused score), best first.
+    """
+    scores: Dict[Hashable, float] = {}
+    items: Dict[Hashable, T] = {}
+    for ranking in rankings:
+        for rank, (key, item) in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            items.setdefault(key, item)
+    return [(items[key], score) for key, score in sorted(scores.items(), key=lambda kv: kv[1], reverse=True)]
+
+
+def rerank_scores(query: str, texts: List[str]) -> List[float]:
+    """Cross-encoder relevance of each text to the query, computed in-process."""
+    if not texts:
+        return []
+    with client_registry.use(RERANKER) as reranker:
+        return [float(score) for score in reranker.predict([(query, text) for text in texts])]
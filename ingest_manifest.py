@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Local record of what has been ingested into the vector store, per document
+INGEST_MANIFEST_PATH = os.getenv("INGEST_MANIFEST_PATH", "ingest_manifest.json")
+
+
+def file_hash(filepath: str) -> str:
+    """SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_hash(filename: str, page, text: str) -> str:
+    """
+    Content hash of one chunk, also used as its vector ID.
+
+    The filename and page are part of the hash so identical text in two
+    documents (or two pages) keeps separate, correctly cited vectors.
+    """
+    return hashlib.sha256(f"{filename}\x00{page}\x00{text}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class DocumentRecord:
+    doc_hash: str
+    settings: Dict
+    pages: int
+    chunk_ids: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ChunkPlan:
+    """Which chunks of a re-ingested document must be added, kept or deleted."""
+    add: List[int]
+    reused: List[str]
+    delete: List[str]
+
+
+class IngestManifest:
+    """JSON manifest mapping each ingested document to its content hash and chunk vector IDs."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._documents: Dict[str, DocumentRecord] = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                raw = json.load(f)
+            self._documents = {name: DocumentRecord(**record) for name, record in raw.items()}
+
+    def get(self, filename: str):
+        with self._lock:
+            return self._documents.get(filename)
+
+    def documents(self) -> Dict[str, DocumentRecord]:
+        """Snapshot of every ingested document by filename."""
+        with self._lock:
+            return dict(self._documents)
+
+    def is_unchanged(self, filename: str, doc_hash: str, settings: Dict) -> bool:
+        """True if exactly this file content was already ingested with the same settings."""
+        record = self.get(filename)
+        return record is not None and record.doc_hash == doc_hash and record.settings == settings
+
+    def plan(self, filename: str, chunk_ids: List[str]) -> ChunkPlan:
+        """Compare freshly computed chunk IDs against the last ingestion of ``filename``."""
+        record = self.get(filename)
+        previous = set(record.chunk_ids) if record else set()
+        current = set(chunk_ids)
+        add, seen = [], set()
+        for position, chunk_id in enumerate(chunk_ids):
+            if chunk_id not in previous and chunk_id not in seen:
+                add.append(position)
+            seen.add(chunk_id)
+        return ChunkPlan(
+            add=add,
+            reused=sorted(previous & current),
+            delete=sorted(previous - current),
+        )
+
+    def record(self, filename: str, doc_hash: str, settings: Dict, pages: int, chunk_ids: List[str]) -> None:
+        """Store the new state of ``filename`` and write the manifest to disk."""
+        with self._lock:
+            self._documents[filename] = DocumentRecord(
+                doc_hash=doc_hash,
+                settings=settings,
+                pages=pages,
+                chunk_ids=list(dict.fromkeys(chunk_ids)),
+            )
+            self._save()
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({name: vars(record) for name, record in self._documents.items()}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+# Shared manifest instance
+ingest_manifest = IngestManifest(INGEST_MANIFEST_PATH)
@@ -0,0 +1,201 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Iterable, List, Optional
+
+from dotenv import load_dotenv
+from langchain_core.documents import Document as LangchainDocument
+from termcolor import colored
+
+from metrics import metrics
+
+load_dotenv()
+
+# Cohere accepts at most 96 texts per embed call
+EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "96"))
+# Pinecone recommends upserts of up to 100 vectors
+UPSERT_BATCH_SIZE = int(os.getenv("INGEST_UPSERT_BATCH_SIZE", "100"))
+EMBED_WORKERS = int(os.getenv("INGEST_EMBED_WORKERS", "4"))
+UPSERT_WORKERS = int(os.getenv("INGEST_UPSERT_WORKERS", "4"))
+# Batches that may be embedded or waiting for upsert at once; bounds memory
+MAX_IN_FLIGHT = int(os.getenv("INGEST_MAX_IN_FLIGHT", "8"))
+MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", "5"))
+
+# Same key langchain_pinecone uses, so retrieve() finds the chunk text in metadata
+TEXT_KEY = "text"
+
+
+@dataclass
+class IngestionStats:
+    chunks: int = 0
+    batches: int = 0
+    retries: int = 0
+    embed_seconds: float = 0.0
+    upsert_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.wall_seconds if self.wall_seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.chunks} chunks in {self.batches} batches, "
+            f"{self.chunks_per_second:.1f} chunks/s "
+            f"(embed {self.embed_seconds:.2f}s, upsert {self.upsert_seconds:.2f}s worker time, "
+            f"{self.retries} retries)"
+        )
+
+
+def _batched(items: Iterable, size: int):
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class IngestionPipeline:
+    """
+    Streams chunks through concurrent embedding and upsert stages.
+
+    Chunks are grouped into batches of ``embed_batch_size`` and embedded by a
+    pool of workers; each embedded batch is handed to a separate pool that
+    upserts it in slices of ``upsert_batch_size``. At most ``max_in_flight``
+    batches are between the two ends at any time, so a slow index throttles
+    embedding instead of piling vectors up in memory. Failed calls are
+    retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        index,
+        namespace: str,
+        embed_batch_size: int = EMBED_BATCH_SIZE,
+        upsert_batch_size: int = UPSERT_BATCH_SIZE,
+        embed_workers: int = EMBED_WORKERS,
+        upsert_workers: int = UPSERT_WORKERS,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        max_retries: int = MAX_RETRIES,
+        retry_delay: float = 1.0,
+    ):
+        self.embeddings = embeddings
+        self.index = index
+        self.namespace = namespace
+        self.embed_batch_size = embed_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.embed_workers = embed_workers
+        self.upsert_workers = upsert_workers
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+
+    def run(
+        self,
+        chunks: Iterable[LangchainDocument],
+        ids: Optional[Iterable[str]] = None,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> IngestionStats:
+        """
+        Embed and upsert ``chunks``.
+
+        Args:
+            chunks (Iterable[LangchainDocument]): Chunks to ingest; consumed lazily.
+            ids (Iterable[str]): Vector IDs matching ``chunks``. Random UUIDs by default.
+            progress (Callable[[int], None]): Called with the number of chunks upserted so far.
+                Always invoked on the calling thread, so it may update Streamlit elements.
+
+        Returns:
+            IngestionStats: Counts, throughput and per-stage timings.
+        """
+        stats = IngestionStats()
+        ids = iter(ids) if ids is not None else None
+        slots = threading.BoundedSemaphore(self.max_in_flight)
+        pending: List[Future] = []
+        failure: List[BaseException] = []
+        reported = 0
+        start = time.perf_counter()
+
+        def report():
+            nonlocal reported
+            with self._lock:
+                done = stats.chunks
+            if progress is not None and done != reported:
+                reported = done
+                progress(done)
+
+        def track(future: Future) -> Future:
+            # Stop feeding new batches as soon as any stage has failed for good
+            future.add_done_callback(lambda f: f.exception() is not None and failure.append(f.exception()))
+            return future
+
+        with ThreadPoolExecutor(self.embed_workers, thread_name_prefix="embed") as embed_pool, \
+                ThreadPoolExecutor(self.upsert_workers, thread_name_prefix="upsert") as upsert_pool:
+
+            def upsert(batch_ids, batch, vectors):
+                try:
+                    records = [
+                        {"id": id_, "values": vector, "metadata": {**doc.metadata, TEXT_KEY: doc.page_content}}
+                        for id_, doc, vector in zip(batch_ids, batch, vectors)
+                    ]
+                    started = time.perf_counter()
+                    for part in _batched(records, self.upsert_batch_size):
+                        self._retry(lambda: self.index.upsert(vectors=part, namespace=self.namespace), stats)
+                    elapsed = time.perf_counter() - started
+                    metrics.observe("ingest_stage_seconds", elapsed, stage="upsert")
+                    with self._lock:
+                        stats.upsert_seconds += elapsed
+                        stats.chunks += len(batch)
+                finally:
+                    slots.release()
+
+            def embed(batch_ids, batch):
+                try:
+                    started = time.perf_counter()
+                    texts = [doc.page_content for doc in batch]
+                    vectors = self._retry(lambda: self.embeddings.embed_documents(texts), stats)
+                    elapsed = time.perf_counter() - started
+                    metrics.observe("ingest_stage_seconds", elapsed, stage="embed")
+                    with self._lock:
+                        stats.embed_seconds += elapsed
+                except BaseException:
+                    slots.release()
+                    raise
+                return track(upsert_pool.submit(upsert, batch_ids, batch, vectors))
+
+            for batch in _batched(chunks, self.embed_batch_size):
+                batch_ids = [next(ids) if ids is not None else str(uuid.uuid4()) for _ in batch]
+                # Backpressure: wait until a batch leaves the pipeline
+                slots.acquire()
+                report()
+                if failure:
+                    slots.release()
+                    break
+                stats.batches += 1
+                pending.append(track(embed_pool.submit(embed, batch_ids, batch)))
+
+            for future in pending:
+                future.result().result()
+                report()
+
+        stats.wall_seconds = time.perf_counter() - start
+        return stats
+
+    def _retry(self, call: Callable, stats: IngestionStats):
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            try:
+                return call()
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    stats.retries += 1
+                metrics.inc("ingest_retries")
+                print(colored(f"Ingestion call failed ({e}), retrying in {delay:.1f}s", "yellow"))
+                time.sleep(delay)
+                delay *= 2
@@ -1,28 +1,37 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 import os
-from pinecone import Pinecone
-from langchain_cohere import CohereEmbeddings
 from langsmith import Client, traceable
 from dotenv import load_dotenv
 from langchain_core.tools import tool
-from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
+import threading
 import uuid
 from pydantic import BaseModel
-from typing import List, Dict, Tuple
+from typing import List
 from prompts import instructions
+from clients import client_registry, VECTOR_INDEX, PINECONE_NAMESPACE
+from embedding_cache import embed_query
+from retrieval_cache import retrieval_cache
+from bm25_index import bm25_index
+from ingestion import TEXT_KEY
+from hybrid_search import (
+    HYBRID_RETRIEVAL,
+    RETRIEVE_CANDIDATES,
+    RETRIEVE_DEDUP_GAP,
+    RETRIEVE_MIN_SCORE,
+    RETRIEVE_RERANK,
+    RETRIEVE_TOP_K,
+    reciprocal_rank_fusion,
+    rerank_scores,
+)
+from retrieval_results import RetrievalResults
+from metrics import metrics
+from async_engine import llm_slot
+from conversation_memory import create_checkpointer, trim_agent_messages
 
 load_dotenv()
 class PineconeVectorStore(BaseModel):
     index_name: str
     query: str
 
-class QueryResult(BaseModel):
-    text: str
-    metadata: Dict
-    score: float
-
-
 # Load environment variables from .env file
 load_dotenv()
 
@@ -34,75 +43,186 @@ langsmith_api_key = os.getenv("LANGSMITH_API_KEY")
 os.environ["LANGSMITH_TRACING"] = "true"
 custom_client = Client(api_key=langsmith_api_key)
 
-@tool
-def retrieve(query: str):
-    """This tool contains all the information You are ever going to be asked about."""
-    try:
-        # Initialize embeddings and Pinecone
-        embeddings = CohereEmbeddings(
-                model="embed-multilingual-v3.0",
-            )
-        
-        pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-        index_name = "italian-pdf-docs"
-        index = pc.Index(index_name)
-        
-        # Update trending count
-        
-        # Get query embedding
-        query_embedding = embeddings.embed_query(query)
-        
-        # Query Pinecone
+def query_index(query_embedding: List[float], top_k: int = 10) -> RetrievalResults:
+    """Query the vector store for the nearest chunks, reusing cached results until the index changes."""
+    query_results = retrieval_cache.get(query_embedding, PINECONE_NAMESPACE, top_k)
+    if query_results is not None:
+        return query_results
+
+    version = retrieval_cache.version
+    with client_registry.use(VECTOR_INDEX) as index:
         results = index.query(
             vector=query_embedding,
-            top_k=10,
+            top_k=top_k,
             include_metadata=True,
-            namespace="Test-1",
+            namespace=PINECONE_NAMESPACE,
         )
-        
-        # Extract results and metadata
-        query_results = []
-        for match in results["matches"]:
-            text = match["metadata"].get("text", "")
-            metadata = {
-                "page": match["metadata"].get("page", "Unknown"),
-                "score": match["score"],
-                # Add any other metadata fields you want to track
-                "chunk_index": match["metadata"].get("chunk_index", "Unknown"),
-                "filename": match["metadata"].get("filename", "Unknown"),
-            }
-            query_results.append(QueryResult(text=text, metadata=metadata, score=match["score"]))
-        
-        # Print results for verification
-        
-        # Return both texts and full metadata
-        texts = [result.text for result in query_results]
-        metadata_list = [result.metadata for result in query_results]
-        return texts, metadata_list
-        
+
+    # One validated batch instead of an object per match
+    query_results = RetrievalResults.from_matches(results["matches"])
+    retrieval_cache.put(query_embedding, PINECONE_NAMESPACE, top_k, query_results, version)
+    return query_results
+
+
+# Vector ids listed (and fetched) per vector-store call during the BM25 backfill
+BM25_BACKFILL_BATCH_SIZE = 100
+_bm25_backfill_lock = threading.Lock()
+_bm25_backfilled = False
+
+
+def backfill_bm25_index() -> None:
+    """
+    Add vector-store chunks missing from the BM25 index, once per process.
+
+    Documents embedded before the BM25 index existed (PRE_MANIFEST_PDF_DOCUMENTS
+    in app.py) are only in the vector store; their text and metadata are read
+    back from it. Listing ids needs the local store or a serverless Pinecone
+    index; otherwise those documents must be re-uploaded to be keyword-searchable.
+    """
+    global _bm25_backfilled
+    with _bm25_backfill_lock:
+        if _bm25_backfilled:
+            return
+        _bm25_backfilled = True
+        added = 0
+        try:
+            index = client_registry.get(VECTOR_INDEX)
+            for ids in index.list(namespace=PINECONE_NAMESPACE, limit=BM25_BACKFILL_BATCH_SIZE):
+                missing = [chunk_id for chunk_id in ids if chunk_id not in bm25_index]
+                if not missing:
+                    continue
+                vectors = index.fetch(ids=missing, namespace=PINECONE_NAMESPACE)["vectors"]
+                chunks = []
+                for chunk_id, vector in vectors.items():
+                    metadata = dict(vector["metadata"] or {})
+                    text = metadata.pop(TEXT_KEY, "")
+                    if text:
+                        chunks.append((chunk_id, text, metadata))
+                added += bm25_index.add(chunks)
+        except Exception as e:
+            print(f"BM25 backfill from the vector store failed; documents uploaded before the BM25 index need re-uploading for keyword search: {e}")
+        bm25_index.flush()
+        if added:
+            print(f"BM25 index backfilled with {added} chunks from the vector store")
+        if not len(bm25_index):
+            print("BM25 index is empty; retrieval uses vector search only")
+
+
+def lexical_search(query: str, top_k: int) -> RetrievalResults:
+    """BM25 matches over the ingested chunks, in the same shape as query_index results."""
+    hits = bm25_index.search(query, top_k)
+    return RetrievalResults(
+        ids=[chunk_id for chunk_id, _, _, _ in hits],
+        texts=[text for _, _, text, _ in hits],
+        filenames=[metadata.get("filename", "Unknown") for _, _, _, metadata in hits],
+        pages=[metadata.get("page", "Unknown") for _, _, _, metadata in hits],
+        start_indexes=[metadata.get("start_index") for _, _, _, metadata in hits],
+        scores=[score for _, score, _, _ in hits],
+    )
+
+
+def hybrid_search(query: str, query_embedding: List[float]) -> RetrievalResults:
+    """Dense and BM25 candidates fused by reciprocal rank (dense only while the BM25 index is empty), optionally reranked by a local cross-encoder."""
+    with metrics.span("retrieve_seconds", stage="query"):
+        dense = query_index(query_embedding, top_k=RETRIEVE_CANDIDATES).above(RETRIEVE_MIN_SCORE)
+    backfill_bm25_index()
+    if len(bm25_index):
+        with metrics.span("retrieve_seconds", stage="lexical"):
+            lexical = lexical_search(query, RETRIEVE_CANDIDATES)
+        fused = reciprocal_rank_fusion([
+            [(chunk_id, (batch, i)) for i, chunk_id in enumerate(batch.ids)] for batch in (dense, lexical)
+        ])
+        candidates = RetrievalResults.gather((row for row, _ in fused), scores=[score for _, score in fused])
+    else:
+        # Nothing to fuse with; skip the BM25 leg
+        candidates = dense
+
+    if RETRIEVE_RERANK:
+        with metrics.span("retrieve_seconds", stage="rerank"):
+            scores = rerank_scores(query, candidates.texts)
+        order = sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True)
+        candidates = RetrievalResults.gather(((candidates, i) for i in order), scores=[scores[i] for i in order])
+    return candidates
+
+
+def search_documents(query: str) -> RetrievalResults:
+    """Chunks for the retrieve tool: best RETRIEVE_TOP_K after score threshold and adjacent-chunk dedup."""
+    # Get query embedding (served from the embedding cache when possible)
+    with metrics.span("retrieve_seconds", stage="embed"):
+        query_embedding = embed_query(query)
+
+    # Query the vector store (Pinecone or local, see VECTOR_STORE), fused with BM25 matches
+    if HYBRID_RETRIEVAL:
+        results = hybrid_search(query, query_embedding)
+    else:
+        with metrics.span("retrieve_seconds", stage="query"):
+            results = query_index(query_embedding, top_k=RETRIEVE_CANDIDATES).above(RETRIEVE_MIN_SCORE)
+
+    if RETRIEVE_DEDUP_GAP:
+        results = results.dedup_adjacent(RETRIEVE_DEDUP_GAP)
+    return results.take(range(min(RETRIEVE_TOP_K, len(results))))
+
+
+@tool(response_format="content_and_artifact")
+def retrieve(query: str):
+    """This tool contains all the information You are ever going to be asked about."""
+    try:
+        results = search_documents(query)
+        # Compact numbered passages for the model; (filename, page) pairs for the UI
+        return results.to_prompt(), results.citations()
     except Exception as e:
-        print(f"An error occurred in pinecone vector database query: {e}")
+        print(f"An error occurred in vector database query: {e}")
+        return f"Document search failed: {e}", []
 
 
 
-# Initialize the LLM
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-pro-exp-03-25",
-    temperature=0.2,
-)
+def _run_session() -> str:
+    """Conversation of the agent run the current model call belongs to."""
+    from langchain_core.runnables import ensure_config
+
+    config = ensure_config()
+    return config["configurable"].get("thread_id") or config["metadata"].get("thread_id", "default")
+
+
+def _gemini_pdf():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    class ScheduledChatGoogleGenerativeAI(ChatGoogleGenerativeAI):
+        """Gemini chat model whose async calls each take one scheduler slot, not one per agent run."""
+
+        async def _agenerate(self, *args, **kwargs):
+            async with llm_slot(_run_session()):
+                return await super()._agenerate(*args, **kwargs)
+
+        async def _astream(self, *args, **kwargs):
+            async with llm_slot(_run_session()):
+                async for chunk in super()._astream(*args, **kwargs):
+                    yield chunk
+
+    return ScheduledChatGoogleGenerativeAI(
+        model="gemini-2.5-pro-exp-03-25",
+        temperature=0.2,
+    )
 
-# System instructions
 
 # Set up the agent
 tools = [retrieve]
-memory = MemorySaver()
-agent_executor = create_react_agent(llm, tools, checkpointer=memory)
+# Latest state per conversation, idle conversations evicted; old turns are trimmed before each model call
+memory = create_checkpointer("pdf")
 
-# Function to get agent response with LangSmith tracing
-@traceable(client=custom_client, run_type="llm", name="AI-CASE", project_name="Fiverr")
-def get_completion(user_message, thread_id, is_first=False):
-    """Get a response from the agent, maintaining chat history."""
-    config = {"configurable": {"thread_id": thread_id}}
+
+def _pdf_agent():
+    from langgraph.prebuilt import create_react_agent
+    return create_react_agent(client_registry.get(GEMINI_PDF), tools, checkpointer=memory, pre_model_hook=trim_agent_messages)
+
+
+# The LLM and agent are built on the first question, not at import
+GEMINI_PDF = "gemini_pdf"
+PDF_AGENT = "pdf_agent"
+client_registry.register(GEMINI_PDF, _gemini_pdf)
+client_registry.register(PDF_AGENT, _pdf_agent)
+
+def _build_messages(user_message):
     messages = []
     
     # Always include system instructions to ensure the model follows citation requirements
@@ -112,10 +232,26 @@ def get_completion(user_message, thread_id, is_first=False):
     # Add a reminder about citations to the user's message
     enhanced_message = f"{user_message}\n\n(Remember to cite ALL information from the documents using the format: **[Document Name]** **[Page X]**)"
     messages.append({"role": "user", "content": enhanced_message})
+    return messages
+
+
+def _message_text(content) -> str:
+    """Text of a message or chunk whose content may be a string or a list of parts."""
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+
+
+# Function to get agent response with LangSmith tracing
+@traceable(client=custom_client, run_type="llm", name="AI-CASE", project_name="Fiverr")
+def get_completion(user_message, thread_id, is_first=False):
+    """Get a response from the agent, maintaining chat history."""
+    config = {"configurable": {"thread_id": thread_id}}
+    messages = _build_messages(user_message)
     
     final_state = None
     try:
-        for event in agent_executor.stream({"messages": messages}, stream_mode="values", config=config):
+        for event in client_registry.get(PDF_AGENT).stream({"messages": messages}, stream_mode="values", config=config):
             final_state = event
         if final_state:
             messages = final_state["messages"]
@@ -128,6 +264,80 @@ def get_completion(user_message, thread_id, is_first=False):
         return f"Error: Unable to generate response due to {str(e)}"
 
 
+@traceable(client=custom_client, run_type="llm", name="AI-CASE-stream", project_name="Fiverr")
+def stream_completion(user_message, thread_id):
+    """
+    Streaming variant of get_completion.
+
+    Yields event dicts as the agent works: {"type": "status", "label": ...} when the
+    agent searches the documents or gets retrieval hits back, then
+    {"type": "token", "content": ...} for each piece of the answer.
+    """
+    config = {"configurable": {"thread_id": thread_id}}
+    messages = _build_messages(user_message)
+    try:
+        for mode, payload in client_registry.get(PDF_AGENT).stream({"messages": messages}, stream_mode=["updates", "messages"], config=config):
+            yield from _agent_events(mode, payload)
+    except Exception as e:
+        print(f"An error occurred: {str(e)}")
+        yield {"type": "token", "content": f"Error: Unable to generate response due to {str(e)}"}
+
+
+def _agent_events(mode, payload):
+    """Translate one ReAct agent stream item into chat events."""
+    if mode == "updates":
+        for update in payload.values():
+            for msg in (update or {}).get("messages", []):
+                if msg.type == "ai" and msg.tool_calls:
+                    for call in msg.tool_calls:
+                        yield {"type": "status", "label": f"🔎 Searching documents: {call['args'].get('query', '')}"}
+                elif msg.type == "tool":
+                    files = sorted({filename for filename, _ in (getattr(msg, "artifact", None) or [])})
+                    label = f"📄 Found passages in: {', '.join(files)}" if files else "📄 No matching passages found"
+                    yield {"type": "status", "label": label}
+    else:
+        chunk, metadata = payload
+        # Only stream model text; tool-call chunks carry no content
+        if metadata.get("langgraph_node") == "agent" and not getattr(chunk, "tool_call_chunks", None):
+            text = _message_text(chunk.content)
+            if text:
+                yield {"type": "token", "content": text}
+
+
+@traceable(client=custom_client, run_type="llm", name="AI-CASE-async", project_name="Fiverr")
+async def aget_completion(user_message, thread_id):
+    """
+    Async variant of get_completion. Each model call of the agent run takes a
+    scheduler slot (tool calls don't), so it must run on the async engine loop
+    (async_engine.run(...)).
+    """
+    config = {"configurable": {"thread_id": thread_id}}
+    messages = _build_messages(user_message)
+    try:
+        final_state = await client_registry.get(PDF_AGENT).ainvoke({"messages": messages}, config=config)
+        for msg in reversed(final_state["messages"]):
+            if msg.type == "ai":
+                return msg.content
+        return "No response generated."
+    except Exception as e:
+        print(f"An error occurred: {str(e)}")
+        return f"Error: Unable to generate response due to {str(e)}"
+
+
+@traceable(client=custom_client, run_type="llm", name="AI-CASE-astream", project_name="Fiverr")
+async def astream_completion(user_message, thread_id):
+    """Async variant of stream_completion; consume it via async_engine.iterate(...) from sync code."""
+    config = {"configurable": {"thread_id": thread_id}}
+    messages = _build_messages(user_message)
+    try:
+        async for mode, payload in client_registry.get(PDF_AGENT).astream({"messages": messages}, stream_mode=["updates", "messages"], config=config):
+            for event in _agent_events(mode, payload):
+                yield event
+    except Exception as e:
+        print(f"An error occurred: {str(e)}")
+        yield {"type": "token", "content": f"Error: Unable to generate response due to {str(e)}"}
+
+
 # Function to test the agent's response
 def test_agent_response(query):
     """Test the agent's response to a query."""
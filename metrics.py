@@ -0,0 +1,166 @@
+import functools
+import inspect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Tuple
+
+# Latency buckets in seconds, from cache hits up to slow LLM and LlamaParse calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound below which a fraction ``q`` of observations fall."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+
+class Span:
+    """Timing of one stage; ``elapsed`` is set when the ``with`` block exits."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+
+
+class MetricsRegistry:
+    """
+    In-process registry of counters and latency histograms.
+
+    Metrics are identified by name plus keyword labels, e.g.
+    ``observe("csv_node_seconds", 1.2, node="generate_query")``, and can be
+    dumped as Prometheus text or JSON without any external tracing service.
+    """
+
+    def __init__(self):
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._histograms.setdefault(name, {})
+            if key not in family:
+                family[key] = Histogram()
+            family[key].observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._counters.setdefault(name, {})
+            family[key] = family.get(key, 0) + amount
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        """Time the enclosed block into histogram ``name``; errors are counted in ``<name>_errors``."""
+        span = Span()
+        try:
+            yield span
+        except Exception:
+            self.inc(f"{name}_errors", **labels)
+            raise
+        finally:
+            span.elapsed = time.perf_counter() - span.start
+            self.observe(name, span.elapsed, **labels)
+
+    def timed(self, name: str, **labels):
+        """Decorator form of :meth:`span`; works on regular and async functions."""
+        def decorator(fn):
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(name, **labels):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def to_json(self) -> str:
+        with self._lock:
+            data = {
+                "histograms": {
+                    name: [
+                        {
+                            "labels": dict(key),
+                            "count": hist.count,
+                            "sum": round(hist.sum, 6),
+                            "p50": hist.quantile(0.5),
+                            "p95": hist.quantile(0.95),
+                            "p99": hist.quantile(0.99),
+                        }
+                        for key, hist in family.items()
+                    ]
+                    for name, family in self._histograms.items()
+                },
+                "counters": {
+                    name: [{"labels": dict(key), "value": value} for key, value in family.items()]
+                    for name, family in self._counters.items()
+                },
+            }
+        return json.dumps(data, indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, family in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in family.items():
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(key, le=bound)} {cumulative}")
+                    lines.append(f"{name}_bucket{_labels(key, le='+Inf')} {hist.count}")
+                    lines.append(f"{name}_sum{_labels(key)} {hist.sum}")
+                    lines.append(f"{name}_count{_labels(key)} {hist.count}")
+            for name, family in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in family.items():
+                    lines.append(f"{name}{_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(key: LabelKey, **extra) -> str:
+    pairs = list(key) + [(k, v) for k, v in extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+# Shared registry instance
+metrics = MetricsRegistry()
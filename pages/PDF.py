@@ -26,7 +26,12 @@ with st.form("pdf_upload_form", clear_on_submit=True):
                     tmp_file.write(uploaded_file.read())
                     tmp_file_path = tmp_file.name
 
-                result = document_chunking_and_uploading_to_vectorstore(tmp_file_path, uploaded_file.name)
+                progress_bar = st.progress(0.0, text="Uploading chunks...")
+                result = document_chunking_and_uploading_to_vectorstore(
+                    tmp_file_path,
+                    uploaded_file.name,
+                    progress=lambda done, total: progress_bar.progress(done / total, text=f"Uploaded {done}/{total} chunks"),
+                )
                 st.success(result)
         else:
             st.error("Please upload a document first.")
@@ -0,0 +1,136 @@
+"""
+On-disk cache of LlamaParse output.
+
+Parsed pages are stored as gzipped JSON under PARSE_CACHE_DIR, keyed by the
+document's content hash plus the parser settings, so re-processing a file
+(for example with different chunking settings) skips the parse entirely.
+
+Usage:
+    python parse_cache.py warm path/to/doc1.pdf path/to/doc2.pdf
+    python parse_cache.py purge            # evict down to PARSE_CACHE_MAX_MB
+    python parse_cache.py purge --all      # remove every entry
+    python parse_cache.py stats
+"""
+import argparse
+import contextlib
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PARSE_CACHE_DIR = os.getenv("PARSE_CACHE_DIR", ".parse_cache")
+PARSE_CACHE_MAX_MB = float(os.getenv("PARSE_CACHE_MAX_MB", "500"))
+
+_SUFFIX = ".json.gz"
+
+
+def cache_key(doc_hash: str, settings: Dict) -> str:
+    payload = json.dumps({"doc": doc_hash, "settings": settings}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ParseCache:
+    """Directory of parsed-page files with least-recently-used eviction by total size."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, doc_hash: str, settings: Dict) -> Optional[List[Dict]]:
+        """Return the cached pages ([{"text", "metadata"}, ...]) or None."""
+        path = self._path(cache_key(doc_hash, settings))
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                pages = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        # Touch the entry so eviction treats it as recently used; it may have been evicted meanwhile
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        with self._lock:
+            self.hits += 1
+        return pages
+
+    def put(self, doc_hash: str, settings: Dict, pages: List[Dict]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(cache_key(doc_hash, settings))
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(pages, f, default=str)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def entries(self) -> List[os.DirEntry]:
+        if not os.path.isdir(self.directory):
+            return []
+        return [entry for entry in os.scandir(self.directory) if entry.name.endswith(_SUFFIX)]
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Delete least recently used entries until the cache fits ``max_bytes``; returns how many were removed."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        with self._lock:
+            entries = sorted(self.entries(), key=lambda entry: entry.stat().st_mtime)
+            total = sum(entry.stat().st_size for entry in entries)
+            removed = 0
+            for entry in entries:
+                if total <= limit:
+                    break
+                total -= entry.stat().st_size
+                os.remove(entry.path)
+                removed += 1
+            return removed
+
+    def stats(self) -> Dict:
+        entries = self.entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(entry.stat().st_size for entry in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Shared cache instance
+parse_cache = ParseCache(PARSE_CACHE_DIR, int(PARSE_CACHE_MAX_MB * 1024 * 1024))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    warm = commands.add_parser("warm", help="parse documents and store the result")
+    warm.add_argument("files", nargs="+")
+    purge = commands.add_parser("purge", help="evict entries down to the size limit")
+    purge.add_argument("--all", action="store_true", help="remove every entry")
+    commands.add_parser("stats", help="show entry count and size")
+    args = parser.parse_args()
+
+    if args.command == "warm":
+        # Imported here so purge/stats work without the LlamaParse stack
+        from document_processing import parse_document
+        for filepath in args.files:
+            pages = parse_document(filepath)
+            print(f"{filepath}: {len(pages)} pages cached")
+    elif args.command == "purge":
+        removed = parse_cache.evict(0 if args.all else None)
+        print(f"Removed {removed} entries")
+    else:
+        print(json.dumps(parse_cache.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
 from langchain_core.prompts import ChatPromptTemplate
-import pandas as pd
-import numpy as np
+
+# Token counts for prompt budgets are estimated at ~4 characters per token,
+# which is close enough for Gemini on mixed English/Italian text and avoids
+# pulling in a tokenizer.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
 
 # Existing prompts remain unchanged; adding a new one
 interpret_question_prompt = ChatPromptTemplate.from_template("""
@@ -38,10 +46,71 @@ Here is the information about CSV data: {csv_description}
                                                          
 Please observe the dataframe and question and take your time to think and plan how you are going to get this analysis and then write codes by thinking step by step.
 Generate a Python code snippet using pandas to answer the question. The DataFrame is named 'df'.
+Copy-on-write is enabled: chained assignment such as df[df['a'] > 0]['b'] = 1 or df['b'][0] = 1 changes nothing, so assign with df.loc[row_selector, 'b'] = value.
 Only provide the code, no explanation.
 """)
 
 
+interpret_and_generate_prompt = ChatPromptTemplate.from_template("""
+You can speak english and italian fluently.
+You are a data analysis expert with access to a pandas dataframe `df`.
+Here is the conversation history:
+{history_str}
+Current user question: {question}
+
+Here is information about the dataframe:
+{df_info}
+
+Here is the information about CSV data: {csv_description}
+
+First rephrase the current question to be standalone, incorporating any necessary context from the history, such as specific dates, months, product names, or other details that the question might be referring to.
+If the question is already clear without additional context, keep it unchanged.
+Then generate a Python code snippet using pandas that answers the rephrased question. The DataFrame is named 'df'.
+Copy-on-write is enabled: chained assignment such as df[df['a'] > 0]['b'] = 1 or df['b'][0] = 1 changes nothing, so assign with df.loc[row_selector, 'b'] = value.
+Answer in exactly this format, with no explanation:
+Standalone question: <the rephrased question>
+Code:
+<the code>
+""")
+
+
+generate_sql_prompt = ChatPromptTemplate.from_template("""
+You can speak english and italian fluently.
+You are a data analysis expert with access to a DuckDB table `df`.
+Here is information about the table:
+{df_info}
+Given the question: {standalone_question}
+
+Here is the information about CSV data: {csv_description}
+
+Please observe the table and question and take your time to think and plan how you are going to get this analysis.
+Write a single DuckDB SQL SELECT query on the table `df` that answers the question.
+The table is too large to return whole: aggregate in SQL and return only the rows the answer needs, using ORDER BY ... LIMIT for top-N questions.
+Only provide the SQL, no explanation.
+""")
+
+
+interpret_and_generate_sql_prompt = ChatPromptTemplate.from_template("""
+You can speak english and italian fluently.
+You are a data analysis expert with access to a DuckDB table `df`.
+Here is the conversation history:
+{history_str}
+Current user question: {question}
+
+Here is information about the table:
+{df_info}
+
+Here is the information about CSV data: {csv_description}
+
+First rephrase the current question to be standalone, incorporating any necessary context from the history, such as specific dates, months, product names, or other details that the question might be referring to.
+If the question is already clear without additional context, keep it unchanged.
+Then write a single DuckDB SQL SELECT query on the table `df` that answers the rephrased question, aggregating in SQL and returning only the rows the answer needs.
+Answer in exactly this format, with no explanation:
+Standalone question: <the rephrased question>
+Code:
+<the SQL query>
+""")
+
 
 format_response_prompt = ChatPromptTemplate.from_template("""
 You are a helpful assistant that formats responses based on user questions and data from a CSV file. You can speak english and italian fluently.
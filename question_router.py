@@ -0,0 +1,47 @@
+import os
+import re
+from typing import List, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Route questions that need no rephrasing straight to query generation
+CSV_FAST_PATH = os.getenv("CSV_FAST_PATH", "1") != "0"
+# Rephrase and generate code in one LLM call for follow-up questions
+CSV_COMBINED_INTERPRET = os.getenv("CSV_COMBINED_INTERPRET", "0") == "1"
+
+# Follow-ups shorter than this are usually elliptical ("and in March?")
+MIN_STANDALONE_WORDS = 4
+
+# Words that point back into the conversation, in English and Italian
+REFERENCE_WORDS = {
+    "it", "its", "that", "those", "these", "this", "them", "they", "their",
+    "same", "previous", "also", "too", "instead", "else", "other",
+    "again", "one", "ones", "there", "then", "former", "latter",
+    "esso", "essa", "quello", "quella", "quelli", "quelle", "questo", "questa",
+    "questi", "queste", "stesso", "stessa", "stessi", "stesse", "anche",
+    "invece", "precedente", "altro", "altra", "altri", "ancora", "ne",
+}
+FOLLOW_UP_PREFIXES = ("and ", "what about", "how about", "but ", "e ", "ma ", "e per", "e invece")
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def is_standalone_question(question: str, history: List[Tuple[str, str]]) -> bool:
+    """
+    Cheap local check whether a question can go to query generation as-is.
+
+    Without history there is nothing to resolve. With history, the question
+    must not start like a follow-up, reference earlier turns, or be too short
+    to stand on its own. False negatives only cost the usual rephrasing call.
+    """
+    if not history:
+        return True
+    text = " ".join(question.split()).casefold()
+    if text.startswith(FOLLOW_UP_PREFIXES):
+        return False
+    words = _WORD.findall(text)
+    if len(words) < MIN_STANDALONE_WORDS:
+        return False
+    return not REFERENCE_WORDS.intersection(words)
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RETRIEVAL_CACHE_MAX_MB = float(os.getenv("RETRIEVAL_CACHE_MAX_MB", "64"))
+
+# Rough per-row overhead on top of the chunk text (id, filename, page, score)
+_RESULT_OVERHEAD_BYTES = 256
+
+
+def vector_hash(vector: Sequence[float]) -> str:
+    return hashlib.sha1(array("d", vector).tobytes()).hexdigest()
+
+
+class RetrievalCache:
+    """
+    Cache of materialized vector-store matches keyed on
+    (query vector hash, namespace, top_k, index version).
+
+    The index version is a process-wide counter bumped after every successful
+    ingestion, so results cached before an upload are never served after it.
+    Entries are evicted least-recently-used once their estimated size exceeds
+    ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str, int, int], Tuple[int, list]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, vector: Sequence[float], namespace: str, top_k: int):
+        with self._lock:
+            key = (vector_hash(vector), namespace, top_k, self.version)
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, vector: Sequence[float], namespace: str, top_k: int, results, version: int) -> None:
+        """
+        Store ``results`` (a RetrievalResults batch) for a query issued while the index was at ``version``.
+
+        Results from a query that raced with an ingestion (version already
+        bumped) are dropped instead of being cached.
+        """
+        size = sum(len(text) + _RESULT_OVERHEAD_BYTES for text in results.texts)
+        with self._lock:
+            if version != self.version or size > self.max_bytes:
+                return
+            key = (vector_hash(vector), namespace, top_k, version)
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[0]
+            self._entries[key] = (size, results)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                _, (evicted_size, _) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self.evictions += 1
+
+    def bump_version(self) -> int:
+        """Mark the index as changed; all cached results become stale and are dropped."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self._total_bytes = 0
+            return self.version
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "index_version": self.version,
+            }
+
+
+# Shared cache instance
+retrieval_cache = RetrievalCache(max_bytes=int(RETRIEVAL_CACHE_MAX_MB * 1024 * 1024))
+
+
+def bump_index_version() -> int:
+    """Called after a successful upload to invalidate cached retrieval results."""
+    return retrieval_cache.bump_version()
@@ -0,0 +1,95 @@
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+from pydantic import BaseModel, model_validator
+
+Page = Union[int, str]
+
+
+class RetrievalResults(BaseModel):
+    """
+    Columnar batch of retrieved chunks: one list per field, row ``i`` across all of them.
+
+    The batch is validated once when built from raw matches; selecting,
+    reordering or re-scoring rows builds new batches with ``model_construct``,
+    sharing the already-validated strings instead of copying or revalidating them.
+    """
+
+    ids: List[str] = []
+    texts: List[str] = []
+    filenames: List[str] = []
+    pages: List[Page] = []
+    start_indexes: List[Optional[int]] = []
+    scores: List[float] = []
+
+    @model_validator(mode="after")
+    def _same_length(self):
+        if len({len(self.ids), len(self.texts), len(self.filenames), len(self.pages), len(self.start_indexes), len(self.scores)}) > 1:
+            raise ValueError("RetrievalResults columns must all have the same length")
+        return self
+
+    @classmethod
+    def from_matches(cls, matches: Sequence[dict]) -> "RetrievalResults":
+        """Build from vector-store matches shaped like Pinecone's {"id", "score", "metadata"}."""
+        metadata = [match["metadata"] or {} for match in matches]
+        return cls(
+            ids=[match["id"] for match in matches],
+            texts=[m.get("text", "") for m in metadata],
+            filenames=[m.get("filename", "Unknown") for m in metadata],
+            pages=[m.get("page", "Unknown") for m in metadata],
+            start_indexes=[m.get("start_index") for m in metadata],
+            scores=[match["score"] for match in matches],
+        )
+
+    @classmethod
+    def gather(cls, rows: Iterable[Tuple["RetrievalResults", int]], scores: Optional[Sequence[float]] = None) -> "RetrievalResults":
+        """Rows picked from one or more batches, optionally with new scores."""
+        rows = list(rows)
+        return cls.model_construct(
+            ids=[batch.ids[i] for batch, i in rows],
+            texts=[batch.texts[i] for batch, i in rows],
+            filenames=[batch.filenames[i] for batch, i in rows],
+            pages=[batch.pages[i] for batch, i in rows],
+            start_indexes=[batch.start_indexes[i] for batch, i in rows],
+            scores=list(scores) if scores is not None else [batch.scores[i] for batch, i in rows],
+        )
+
+    def take(self, positions: Iterable[int]) -> "RetrievalResults":
+        return self.gather((self, i) for i in positions)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def above(self, min_score: float) -> "RetrievalResults":
+        return self.take(i for i, score in enumerate(self.scores) if score >= min_score)
+
+    def dedup_adjacent(self, max_gap: int) -> "RetrievalResults":
+        """
+        Drop chunks that start within ``max_gap`` characters of a better-ranked
+        chunk from the same page; neighbouring chunks overlap and mostly repeat
+        each other.
+        """
+        kept: List[int] = []
+        for i in range(len(self)):
+            start = self.start_indexes[i]
+            if start is not None and any(
+                self.filenames[j] == self.filenames[i]
+                and self.pages[j] == self.pages[i]
+                and self.start_indexes[j] is not None
+                and abs(self.start_indexes[j] - start) <= max_gap
+                for j in kept
+            ):
+                continue
+            kept.append(i)
+        return self.take(kept)
+
+    def citations(self) -> List[Tuple[str, Page]]:
+        return list(zip(self.filenames, self.pages))
+
+    def to_prompt(self) -> str:
+        """Compact text for the agent: a numbered source line per chunk, then its text."""
+        if not len(self):
+            return "No matching passages found."
+        return "\n\n".join(
+            f"[{n}] {filename}, page {page}\n{text.strip()}"
+            for n, (filename, page, text) in enumerate(zip(self.filenames, self.pages, self.texts), start=1)
+        )
@@ -0,0 +1,244 @@
+import ast
+import contextlib
+import io
+import multiprocessing
+import os
+import queue
+import re
+import threading
+import time
+from typing import NamedTuple, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Generated pandas code runs in these worker processes instead of the Streamlit server
+SANDBOX_WORKERS = int(os.getenv("SANDBOX_WORKERS", "2"))
+SANDBOX_TIMEOUT_S = float(os.getenv("SANDBOX_TIMEOUT_S", "30"))
+# Separate, longer budget for a worker's first load of a file version (parsing plus dtype conversion)
+SANDBOX_LOAD_TIMEOUT_S = float(os.getenv("SANDBOX_LOAD_TIMEOUT_S", "600"))
+SANDBOX_MAX_RSS_MB = float(os.getenv("SANDBOX_MAX_RSS_MB", "2048"))
+# Longest query output passed on to the format_response prompt
+MAX_RESULT_CHARS = int(os.getenv("MAX_RESULT_CHARS", "4000"))
+
+# Worker-side DataFrames kept per process, most recently used last
+_WORKER_FILES = 2
+_POLL_INTERVAL = 0.05
+
+FileVersion = Tuple[str, int, int]
+
+
+class QueryResult(NamedTuple):
+    """Output of one generated query; failed queries carry an "Error executing query: ..." text."""
+    ok: bool
+    text: str
+
+
+def query_error(message: str) -> QueryResult:
+    return QueryResult(False, f"Error executing query: {message}")
+
+
+def execute_code(code: str, namespace: dict) -> str:
+    """
+    Run a generated pandas snippet in ``namespace`` the way PythonAstREPLTool does.
+
+    The output is the value of a trailing expression, or else whatever the
+    snippet printed. Unlike the tool, which returns exceptions as output
+    text, errors are raised, so a failure can't pass for a result.
+    """
+    # Same input sanitizing as the tool: strip Markdown fences and a leading "python"
+    code = re.sub(r"^(\s|`)*(?i:python)?\s*", "", code)
+    code = re.sub(r"(\s|`)*$", "", code)
+    tree = ast.parse(code)
+    last = tree.body.pop() if tree.body and isinstance(tree.body[-1], ast.Expr) else None
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        exec(compile(tree, "<query>", "exec"), namespace)
+        if last is not None:
+            value = eval(compile(ast.Expression(last.value), "<query>", "eval"), namespace)
+            if value is not None:
+                return str(value)
+    return output.getvalue()
+
+
+def truncate_result(text: str, limit: int = MAX_RESULT_CHARS) -> str:
+    """Cut oversized query output so it doesn't inflate the next prompt."""
+    if len(text) <= limit:
+        return text
+    return text[:limit] + f"\n... [truncated {len(text) - limit} more characters]"
+
+
+def _worker_main(conn) -> None:
+    """
+    Worker loop: ("load", version) loads a DataFrame, ("run", version, code)
+    runs a snippet against an already loaded one.
+    """
+    # Heavy imports happen once per worker, before the first request arrives
+    from data_cache import read_data_file
+
+    frames = {}
+    conn.send(("ready", None))
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        try:
+            version = request[1]
+            if request[0] == "load":
+                if version not in frames:
+                    if len(frames) >= _WORKER_FILES:
+                        frames.pop(next(iter(frames)))
+                    # Sidecars are memory-mapped, so numeric columns share the page cache across workers
+                    frames[version] = read_data_file(version[0])
+                frames[version] = frames.pop(version)
+                conn.send(QueryResult(True, ""))
+            else:
+                df = frames[version]
+                conn.send(QueryResult(True, truncate_result(execute_code(request[2], {"df": df.copy(deep=False)}))))
+        except Exception as e:
+            conn.send(query_error(f"{type(e).__name__}: {e}"))
+
+
+def _rss_bytes(pid: int) -> int:
+    """Resident set size of a process on Linux; 0 where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True, name="pandas-sandbox")
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class SandboxPool:
+    """
+    Pool of pre-warmed processes that execute LLM-generated pandas code.
+
+    Each call gets a wall-clock timeout and an RSS cap; a worker that exceeds
+    either, or whose call is cancelled, is killed and replaced, so a runaway
+    query never blocks or OOMs the server process. Loading the file is a
+    separate step with its own ``load_timeout``, so a cold load of a large
+    file doesn't eat the query's budget (and get the worker killed before
+    it ever warms up).
+    """
+
+    def __init__(self, workers: int, timeout: float, max_rss_bytes: float, load_timeout: float = SANDBOX_LOAD_TIMEOUT_S):
+        self.size = workers
+        self.timeout = timeout
+        self.load_timeout = load_timeout
+        self.max_rss_bytes = max_rss_bytes
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._started = False
+        self._lock = threading.Lock()
+        self.timeouts = 0
+        self.oom_kills = 0
+        self.cancellations = 0
+
+    def start(self) -> None:
+        """Spawn the workers ahead of the first query."""
+        with self._lock:
+            if self._started:
+                return
+            for _ in range(self.size):
+                self._idle.put(_Worker(self._ctx))
+            self._started = True
+
+    def run(self, version: FileVersion, code: str, cancel: Optional[threading.Event] = None) -> QueryResult:
+        """
+        Execute ``code`` against the DataFrame of ``version`` = (path, mtime_ns, size).
+
+        Returns:
+            QueryResult: The (truncated) output, or ok=False and an "Error executing query: ..." message.
+        """
+        self.start()
+        worker = self._acquire(cancel)
+        if isinstance(worker, QueryResult):
+            return worker
+        try:
+            if not worker.ready:
+                # Wait for the spawn + imports to finish; not part of the query's time budget
+                failure = self._await(worker, self.load_timeout, cancel, "sandbox worker did not start")
+                if failure is not None:
+                    return self._replace(worker, failure)
+                status, _ = worker.conn.recv()
+                worker.ready = status == "ready"
+            worker.conn.send(("load", version))
+            failure = self._await(worker, self.load_timeout, cancel, "loading the data file timed out")
+            if failure is not None:
+                return self._replace(worker, failure)
+            result = QueryResult(*worker.conn.recv())
+            if result.ok:
+                # The query's own time budget starts once the frame is in memory
+                worker.conn.send(("run", version, code))
+                failure = self._await(worker, self.timeout, cancel, "timed out")
+                if failure is not None:
+                    return self._replace(worker, failure)
+                result = QueryResult(*worker.conn.recv())
+        except (EOFError, OSError) as e:
+            # The worker died (e.g. killed by the OS); give the caller an error and start a fresh one
+            return self._replace(worker, query_error(f"sandbox worker failed ({e})"))
+        self._idle.put(worker)
+        return result
+
+    def _acquire(self, cancel: Optional[threading.Event]):
+        """An idle worker, or the error to return if none frees up within ``load_timeout`` or the call is cancelled."""
+        deadline = time.monotonic() + self.load_timeout
+        while True:
+            try:
+                return self._idle.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                pass
+            if cancel is not None and cancel.is_set():
+                self.cancellations += 1
+                return query_error("cancelled")
+            if time.monotonic() > deadline:
+                self.timeouts += 1
+                return query_error(f"no sandbox worker became free within {self.load_timeout:.0f} seconds")
+
+    def _await(self, worker: _Worker, timeout: float, cancel: Optional[threading.Event], timed_out: str) -> Optional[QueryResult]:
+        """Wait for the worker's reply; None once it is ready to read, else the error to kill the worker with."""
+        deadline = time.monotonic() + timeout
+        while not worker.conn.poll(_POLL_INTERVAL):
+            if cancel is not None and cancel.is_set():
+                self.cancellations += 1
+                return query_error("cancelled")
+            if time.monotonic() > deadline:
+                self.timeouts += 1
+                return query_error(f"{timed_out} after {timeout:.0f} seconds")
+            if self.max_rss_bytes and _rss_bytes(worker.process.pid) > self.max_rss_bytes:
+                self.oom_kills += 1
+                return query_error(f"memory limit of {self.max_rss_bytes / 2**20:.0f} MB exceeded")
+        return None
+
+    def _replace(self, worker: _Worker, result: QueryResult) -> QueryResult:
+        worker.kill()
+        self._idle.put(_Worker(self._ctx))
+        return result
+
+    def stats(self):
+        return {
+            "workers": self.size,
+            "idle": self._idle.qsize(),
+            "timeouts": self.timeouts,
+            "oom_kills": self.oom_kills,
+            "cancellations": self.cancellations,
+        }
+
+
+# Shared pool instance; workers are spawned on first use
+sandbox_pool = SandboxPool(SANDBOX_WORKERS, SANDBOX_TIMEOUT_S, SANDBOX_MAX_RSS_MB * 1024 * 1024)
@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+from termcolor import colored
+
+from dtype_optimizer import MemoryReport, dtype_settings, optimize_dtypes
+
+# Columnar copies of CSV/XLSX files are written next to the source as
+# "<file>.arrow" (uncompressed Arrow IPC / Feather v2, so they can be mmapped).
+SIDECAR_SUFFIX = ".arrow"
+
+# Schema metadata keys recording which version of the source the sidecar was built from
+_SOURCE_SIZE_KEY = b"source_size"
+_SOURCE_MTIME_KEY = b"source_mtime_ns"
+# Sidecars hold the frame with its compact dtypes already applied, and the settings and report of that conversion
+_DTYPE_SETTINGS_KEY = b"dtype_settings"
+_MEMORY_REPORT_KEY = b"memory_report"
+
+# Single background worker so conversions never compete with chat requests for CPU
+_converter = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sidecar")
+_lock = threading.Lock()
+_pending = set()
+# (path, mtime_ns, size) of source versions whose sidecar could not be written; retried once the file changes
+_failed = set()
+
+
+def _source_version(file_path: str, stat: os.stat_result) -> Tuple[str, int, int]:
+    return os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size
+
+
+def _has_failed(file_path: str) -> bool:
+    version = _source_version(file_path, os.stat(file_path))
+    with _lock:
+        return version in _failed
+
+
+def sidecar_path(file_path: str) -> str:
+    """Return the sidecar location for a CSV/XLSX/Parquet file."""
+    return file_path + SIDECAR_SUFFIX
+
+
+def is_sidecar_fresh(file_path: str) -> bool:
+    """True if a sidecar exists and was built from the current version of ``file_path``."""
+    path = sidecar_path(file_path)
+    if not os.path.exists(path):
+        return False
+    try:
+        stat = os.stat(file_path)
+        with pa.memory_map(path) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return False
+    return (
+        metadata.get(_SOURCE_SIZE_KEY) == str(stat.st_size).encode()
+        and metadata.get(_SOURCE_MTIME_KEY) == str(stat.st_mtime_ns).encode()
+        and metadata.get(_DTYPE_SETTINGS_KEY) == dtype_settings().encode()
+    )
+
+
+def write_sidecar(file_path: str, df: pd.DataFrame, report: MemoryReport, source_stat: Optional[os.stat_result] = None) -> Optional[str]:
+    """
+    Write ``df`` as the columnar sidecar of ``file_path``.
+
+    Args:
+        file_path (str): The source CSV/XLSX file.
+        df (pd.DataFrame): The parsed contents of ``file_path``, after optimize_dtypes.
+        report (MemoryReport): The report optimize_dtypes returned with ``df``.
+        source_stat (os.stat_result): Stat of the source taken before it was
+            parsed. Defaults to stat-ing the file now.
+
+    Returns:
+        str: Path of the written sidecar, or None if the data could not be
+        converted to Arrow (e.g. mixed-type object columns) or written.
+    """
+    stat = source_stat or os.stat(file_path)
+    path = sidecar_path(file_path)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        table = pa.Table.from_pandas(df)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_SOURCE_SIZE_KEY] = str(stat.st_size).encode()
+        metadata[_SOURCE_MTIME_KEY] = str(stat.st_mtime_ns).encode()
+        metadata[_DTYPE_SETTINGS_KEY] = dtype_settings().encode()
+        metadata[_MEMORY_REPORT_KEY] = json.dumps(vars(report)).encode()
+        table = table.replace_schema_metadata(metadata)
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        # Atomic swap so readers never see a half-written sidecar
+        os.replace(tmp_path, path)
+        return path
+    except (OSError, pa.ArrowException) as e:
+        print(colored(f"Could not write sidecar for {file_path}: {e}", "yellow"))
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        with _lock:
+            _failed.add(_source_version(file_path, stat))
+        return None
+
+
+def _read_table(file_path: str) -> pa.Table:
+    # The map stays open for as long as the returned columns reference it
+    source = pa.memory_map(sidecar_path(file_path))
+    return pa.ipc.open_file(source).read_all()
+
+
+def read_sidecar(file_path: str) -> pd.DataFrame:
+    """Load the sidecar of ``file_path`` through a memory map."""
+    # split_blocks lets numeric and datetime columns without nulls stay zero-copy views
+    return _read_table(file_path).to_pandas(split_blocks=True)
+
+
+def read_source_file(file_path: str) -> pd.DataFrame:
+    """Parse the original CSV/XLSX/Parquet file."""
+    if file_path.endswith('.xlsx'):
+        return pd.read_excel(file_path)
+    elif file_path.endswith('.csv'):
+        return pd.read_csv(file_path)
+    elif file_path.endswith('.parquet'):
+        return pd.read_parquet(file_path)
+    raise ValueError("Unsupported file format. Use .xlsx, .csv or .parquet.")
+
+
+def load_with_sidecar(file_path: str) -> Tuple[pd.DataFrame, MemoryReport]:
+    """
+    Load from a fresh sidecar, or parse the source, convert its dtypes and (re)build the sidecar.
+
+    Returns:
+        Tuple[pd.DataFrame, MemoryReport]: The frame with compact dtypes and the report of that conversion.
+    """
+    if is_sidecar_fresh(file_path):
+        try:
+            table = _read_table(file_path)
+            report = MemoryReport(**json.loads(table.schema.metadata[_MEMORY_REPORT_KEY]))
+            return table.to_pandas(split_blocks=True), report
+        except (OSError, pa.ArrowException, KeyError, ValueError) as e:
+            print(colored(f"Ignoring unreadable sidecar for {file_path}: {e}", "yellow"))
+    stat = os.stat(file_path)
+    df, report = optimize_dtypes(read_source_file(file_path))
+    with _lock:
+        failed = _source_version(file_path, stat) in _failed
+    if not failed:
+        write_sidecar(file_path, df, report, stat)
+    return df, report
+
+
+def ensure_sidecar(file_path: str) -> bool:
+    """Build the sidecar for ``file_path`` if it is missing or stale; False if it could not be written."""
+    try:
+        if is_sidecar_fresh(file_path):
+            return True
+        if _has_failed(file_path):
+            # Parsing again would fail the same way until the file changes
+            return False
+        stat = os.stat(file_path)
+        return write_sidecar(file_path, *optimize_dtypes(read_source_file(file_path)), stat) is not None
+    finally:
+        with _lock:
+            _pending.discard(file_path)
+
+
+def schedule_sidecar(file_path: str) -> None:
+    """Queue a background sidecar build for a newly seen or changed file."""
+    if is_sidecar_fresh(file_path) or _has_failed(file_path):
+        return
+    with _lock:
+        if file_path in _pending:
+            return
+        _pending.add(file_path)
+    _converter.submit(ensure_sidecar, file_path)
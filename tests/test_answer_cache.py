@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("dotenv")
+
+from answer_cache import AnswerCache
+
+
+@pytest.fixture
+def cache():
+    cache = AnswerCache(100, semantic=True)
+    cache.put("file", "Top 5 products by revenue in 2023", "df.nlargest(5, 'revenue')", "five rows")
+    return cache
+
+
+def test_near_duplicate_with_same_literals_hits(cache):
+    assert cache.get("file", "top 5 products by revenue in 2023?") is not None
+    assert cache.get("file", "Top 5 product by revenue in 2023") is not None
+
+
+@pytest.mark.parametrize("question", [
+    "Top 10 products by revenue in 2023",
+    "Top 5 products by revenue in 2024",
+])
+def test_different_numbers_never_match(cache, question):
+    assert cache.get("file", question) is None
+
+
+def test_different_file_never_matches(cache):
+    assert cache.get("other file", "Top 5 products by revenue in 2023") is None
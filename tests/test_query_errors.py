@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("dotenv")
+
+from sandbox import SandboxPool, execute_code
+
+
+def test_execute_code_returns_trailing_expression():
+    assert execute_code("x = df['a'] * 2\nx + 1", {"df": {"a": 3}}) == "7"
+
+
+def test_execute_code_returns_printed_output():
+    assert execute_code("```python\nprint(df['a'])\n```", {"df": {"a": 3}}) == "3\n"
+
+
+def test_execute_code_raises_instead_of_returning_the_error():
+    with pytest.raises(KeyError):
+        execute_code("df['Price'].sum()", {"df": {"a": 3}})
+
+
+def test_sandbox_marks_raising_code_as_failed(tmp_path):
+    pytest.importorskip("pandas")
+    from data_cache import file_version
+
+    path = tmp_path / "sales.csv"
+    path.write_text("qty,amount\n1,2.5\n3,4.0\n")
+    pool = SandboxPool(workers=1, timeout=60, max_rss_bytes=0)
+    result = pool.run(file_version(str(path)), "df['Price'].sum()")
+    assert not result.ok
+    assert result.text.startswith("Error executing query: KeyError")
+    assert pool.run(file_version(str(path)), "df['qty'].sum()") == (True, "4")
+
+
+def test_failed_query_is_not_cached(monkeypatch):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("langgraph")
+    pytest.importorskip("langsmith")
+    import csv_agent
+    from answer_cache import answer_cache
+
+    monkeypatch.setattr(csv_agent, "CSV_SANDBOX", False)
+    ctx = csv_agent.CsvContext(
+        df=None, version=("sales.csv", 0, 0), content_hash="failing-query-test",
+        namespace={"df": pd.DataFrame({"qty": [1, 3]})},
+        df_info="", df_5_rows="", csv_description="",
+    )
+    state = {"standalone_question": "What is the total price?", "query": "df['Price'].sum()"}
+    update = csv_agent._execute_query(state, ctx)
+    assert update["response"].startswith("Error executing query: KeyError")
+    assert answer_cache.get(ctx.content_hash, state["standalone_question"]) is None
@@ -0,0 +1,3 @@
+def normalize_query(text: str) -> str:
+    """Collapse whitespace and case so trivially different phrasings share an entry."""
+    return " ".join(text.split()).casefold()
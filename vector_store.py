@@ -0,0 +1,221 @@
+import atexit
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Where the local index keeps <namespace>.npy (vectors) and <namespace>.json (ids + metadata)
+VECTOR_STORE_DIR = os.getenv("VECTOR_STORE_DIR", ".vector_store")
+# Approximate search via hnswlib once a namespace has this many vectors; exact NumPy search below it
+VECTOR_STORE_ANN_MIN_VECTORS = int(os.getenv("VECTOR_STORE_ANN_MIN_VECTORS", "50000"))
+# HNSW search breadth; higher is slower and closer to exact
+VECTOR_STORE_EF_SEARCH = int(os.getenv("VECTOR_STORE_EF_SEARCH", "128"))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class _Namespace:
+    def __init__(self, ids: List[str], vectors: np.ndarray, metadata: List[dict]):
+        self.ids = ids
+        self.vectors = vectors
+        self.metadata = metadata
+        self.positions = {id_: i for i, id_ in enumerate(ids)}
+        self.ann = None  # built lazily on the first query after a change
+        self._buffer = None
+
+    def append(self, rows: np.ndarray) -> None:
+        """Add rows, growing a spare-capacity buffer geometrically so batched upserts stay linear."""
+        count = len(self.vectors)
+        if self._buffer is None or count + len(rows) > len(self._buffer):
+            self._buffer = np.empty((max(2 * count, count + len(rows), 1024), rows.shape[1]), dtype=np.float32)
+            self._buffer[:count] = self.vectors
+        self._buffer[count:count + len(rows)] = rows
+        self.vectors = self._buffer[:count + len(rows)]
+
+
+class LocalVectorIndex:
+    """
+    In-process cosine-similarity index exposing the part of the Pinecone
+    ``Index`` API the app uses: ``upsert``, ``delete``, ``query``, ``list``,
+    ``fetch`` and ``describe_index_stats``.
+
+    Each namespace is persisted as a float32 ``.npy`` matrix of normalized
+    vectors, memory-mapped on load, plus a JSON file of ids and metadata.
+    Changes are written by ``flush()`` (and at interpreter exit), not per
+    upsert, so a large ingestion does not rewrite the files per batch.
+    Queries are an exact matrix-vector product; namespaces of at least
+    ``ann_min_vectors`` vectors switch to an HNSW graph when hnswlib is installed.
+    """
+
+    def __init__(self, directory: str, ann_min_vectors: int = VECTOR_STORE_ANN_MIN_VECTORS, ef_search: int = VECTOR_STORE_EF_SEARCH):
+        self.directory = directory
+        self.ann_min_vectors = ann_min_vectors
+        self.ef_search = ef_search
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.RLock()
+        self._dirty = set()
+        atexit.register(self.flush)
+
+    @staticmethod
+    def _stem(namespace: str) -> str:
+        return re.sub(r"[^\w.-]", "_", namespace) or "_default"
+
+    def _paths(self, namespace: str):
+        stem = os.path.join(self.directory, self._stem(namespace))
+        return f"{stem}.npy", f"{stem}.json"
+
+    def _namespace(self, namespace: str) -> _Namespace:
+        ns = self._namespaces.get(namespace)
+        if ns is None:
+            vectors_path, meta_path = self._paths(namespace)
+            if os.path.exists(vectors_path) and os.path.exists(meta_path):
+                with open(meta_path, encoding="utf-8") as f:
+                    meta = json.load(f)
+                ns = _Namespace(meta["ids"], np.load(vectors_path, mmap_mode="r"), meta["metadata"])
+            else:
+                ns = _Namespace([], np.zeros((0, 0), dtype=np.float32), [])
+            self._namespaces[namespace] = ns
+        return ns
+
+    def _save(self, namespace: str, ns: _Namespace) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        vectors_path, meta_path = self._paths(namespace)
+        # Write-then-rename so a crash never leaves a half-written index behind
+        with open(vectors_path + ".tmp", "wb") as f:
+            np.save(f, ns.vectors)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"ids": ns.ids, "metadata": ns.metadata}, f, ensure_ascii=False)
+        os.replace(vectors_path + ".tmp", vectors_path)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def upsert(self, vectors: Iterable[dict], namespace: str = "", **_) -> dict:
+        """Insert or overwrite records given as {"id", "values", "metadata"} dicts."""
+        # Last write wins for ids repeated within the batch
+        records = list({record["id"]: record for record in vectors}.values())
+        if not records:
+            return {"upserted_count": 0}
+        values = _normalize(np.asarray([r["values"] for r in records], dtype=np.float32))
+        with self._lock:
+            ns = self._namespace(namespace)
+            if not ns.vectors.size:
+                ns.vectors = np.zeros((0, values.shape[1]), dtype=np.float32)
+            elif not ns.vectors.flags.writeable:
+                ns.vectors = np.array(ns.vectors)
+            new_rows = []
+            for record, vector in zip(records, values):
+                position = ns.positions.get(record["id"])
+                if position is None:
+                    ns.positions[record["id"]] = len(ns.ids)
+                    ns.ids.append(record["id"])
+                    ns.metadata.append(record.get("metadata", {}))
+                    new_rows.append(vector)
+                else:
+                    ns.vectors[position] = vector
+                    ns.metadata[position] = record.get("metadata", {})
+            if new_rows:
+                ns.append(np.asarray(new_rows))
+            ns.ann = None
+            self._dirty.add(namespace)
+        return {"upserted_count": len(records)}
+
+    def delete(self, ids: Optional[List[str]] = None, namespace: str = "", delete_all: bool = False, **_) -> dict:
+        with self._lock:
+            ns = self._namespace(namespace)
+            if delete_all:
+                drop = set(range(len(ns.ids)))
+            else:
+                drop = {ns.positions[id_] for id_ in ids or [] if id_ in ns.positions}
+            if not drop:
+                return {}
+            keep = [i for i in range(len(ns.ids)) if i not in drop]
+            vectors = np.asarray(ns.vectors)[keep] if keep else np.zeros((0, ns.vectors.shape[1]), dtype=np.float32)
+            self._namespaces[namespace] = _Namespace([ns.ids[i] for i in keep], vectors, [ns.metadata[i] for i in keep])
+            self._dirty.add(namespace)
+        return {}
+
+    def flush(self) -> None:
+        """Persist every namespace changed since the last flush."""
+        with self._lock:
+            for namespace in self._dirty:
+                self._save(namespace, self._namespaces[namespace])
+            self._dirty.clear()
+
+    def query(self, vector: List[float], top_k: int = 10, namespace: str = "", include_metadata: bool = True, **_) -> dict:
+        """Nearest records by cosine similarity, as {"matches": [{"id", "score", "metadata"}]}."""
+        with self._lock:
+            ns = self._namespace(namespace)
+            ids, metadata, vectors = ns.ids, ns.metadata, ns.vectors
+            ann = self._ann(ns) if len(ids) >= self.ann_min_vectors else None
+        if not ids:
+            return {"matches": [], "namespace": namespace}
+
+        query = _normalize(np.asarray([vector], dtype=np.float32))[0]
+        k = min(top_k, len(ids))
+        if ann is not None:
+            labels, distances = ann.knn_query(query, k=k)
+            positions, scores = labels[0], 1.0 - distances[0]
+        else:
+            similarities = vectors @ query
+            positions = np.argpartition(-similarities, k - 1)[:k] if k < len(ids) else np.arange(len(ids))
+            positions = positions[np.argsort(-similarities[positions])]
+            scores = similarities[positions]
+        matches = [
+            {"id": ids[p], "score": float(s), "metadata": metadata[p] if include_metadata else {}}
+            for p, s in zip(positions.tolist(), scores.tolist())
+        ]
+        return {"matches": matches, "namespace": namespace}
+
+    def list(self, namespace: str = "", limit: int = 100, **_) -> Iterator[List[str]]:
+        """Record ids in pages of up to ``limit``, like Pinecone's ``Index.list``."""
+        with self._lock:
+            ids = list(self._namespace(namespace).ids)
+        for start in range(0, len(ids), limit):
+            yield ids[start:start + limit]
+
+    def fetch(self, ids: List[str], namespace: str = "", **_) -> dict:
+        """Stored records by id, as {"vectors": {id: {"id", "values", "metadata"}}}; unknown ids are left out."""
+        with self._lock:
+            ns = self._namespace(namespace)
+            positions = [(id_, ns.positions[id_]) for id_ in ids if id_ in ns.positions]
+            vectors = {
+                id_: {"id": id_, "values": ns.vectors[p].tolist(), "metadata": ns.metadata[p]}
+                for id_, p in positions
+            }
+        return {"vectors": vectors, "namespace": namespace}
+
+    def _ann(self, ns: _Namespace):
+        """HNSW graph over the namespace, or None when hnswlib is not installed."""
+        if ns.ann is None:
+            try:
+                import hnswlib
+            except ImportError:
+                return None
+            index = hnswlib.Index(space="ip", dim=ns.vectors.shape[1])
+            index.init_index(max_elements=len(ns.ids), ef_construction=200, M=16)
+            index.add_items(np.asarray(ns.vectors), np.arange(len(ns.ids)))
+            index.set_ef(self.ef_search)
+            ns.ann = index
+        return ns.ann
+
+    def describe_index_stats(self) -> dict:
+        with self._lock:
+            counts = {self._stem(name): len(ns.ids) for name, ns in self._namespaces.items()}
+            if os.path.isdir(self.directory):
+                for file_name in os.listdir(self.directory):
+                    if file_name.endswith(".json") and file_name[:-5] not in counts:
+                        with open(os.path.join(self.directory, file_name), encoding="utf-8") as f:
+                            counts[file_name[:-5]] = len(json.load(f)["ids"])
+        return {
+            "namespaces": {name: {"vector_count": count} for name, count in counts.items()},
+            "total_vector_count": sum(counts.values()),
+        }